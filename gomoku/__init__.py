@@ -0,0 +1,47 @@
+# gomoku/__init__.py
+"""
+Headless Gomoku engine. Nothing here imports tkinter; the GUI in main.py is
+just one front end. Public names are resolved lazily on first access, so
+`import gomoku` is cheap and worker processes only load the modules they use
+(e.g. the engine server never pulls in sqlite3, the GUI never pulls in asyncio).
+"""
+import importlib
+
+_EXPORTS = {
+    'AI_PLAYER': 'game',
+    'HUMAN_PLAYER': 'game',
+    'GomokuGame': 'game',
+    'MCTSNode': 'mcts',
+    'MCTS_AI': 'mcts',
+    'TimeControl': 'time_control',
+    'GameClock': 'time_control',
+    'FixedIterations': 'time_control',
+    'OpeningBook': 'opening_book',
+    'SearchCache': 'search_cache',
+    'GameArchive': 'game_archive',
+    'EngineWorkerPool': 'engine_server',
+    'EngineServer': 'engine_server',
+    'EngineClient': 'engine_server',
+    'GomocupProtocol': 'engine_server',
+    'load_pattern_weights': 'mcts',
+    'EngineProfile': 'profiles',
+    'PROFILES': 'profiles',
+    'get_profile': 'profiles',
+    'SearchHandle': 'search_worker',
+    'SearchWorker': 'search_worker',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+# gomoku/__main__.py
+# `python -m gomoku` runs the headless engine (Gomocup protocol on stdin/stdout by default).
+from .engine_server import main
+
+main()
@@ -0,0 +1,202 @@
+# gomoku/batch_analysis.py
+import json
+import struct
+import time
+from collections import deque
+
+from .game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+
+# --- Position files ---
+# Text: one position per line, "[id] <size> <X|O to move> <cells>", where
+# cells lists the board row by row with '.' for empty; '#' starts a comment.
+# Binary: BINARY_MAGIC, then per position: size, side to move (0 = X, 1 = O),
+# number of X stones, number of O stones, followed by one byte per stone
+# (its cell index, so boards up to 15x15 fit in a byte).
+BINARY_MAGIC = b'GMKPOS1\n'
+BINARY_RECORD = struct.Struct('<BBBB')
+
+
+def parse_position_line(line, default_id):
+    fields = line.split()
+    if len(fields) == 4:
+        position_id, fields = fields[0], fields[1:]
+    else:
+        position_id = default_id
+    if len(fields) != 3 or not fields[0].isdigit():
+        raise ValueError(f"malformed position {position_id}: {line!r}")
+    size, to_move, cells = int(fields[0]), fields[1], fields[2]
+    if (to_move not in (AI_PLAYER, HUMAN_PLAYER) or len(cells) != size * size
+            or any(cell not in '.XO' for cell in cells)):
+        raise ValueError(f"malformed position {position_id}: {line!r}")
+    board = [' ' if cell == '.' else cell for cell in cells]
+    return position_id, GomokuGame(board=board, current_player=to_move, size=size)
+
+
+def read_positions(path, skip_errors=False):
+    """
+    Yields (id, GomokuGame) one at a time from a text or binary position file.
+    A malformed position raises ValueError, or with skip_errors is yielded
+    as (id, ValueError) so a long run can report it and carry on.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            index = 0
+            while True:
+                header = f.read(BINARY_RECORD.size)
+                if len(header) < BINARY_RECORD.size:
+                    return
+                size, to_move, x_count, o_count = BINARY_RECORD.unpack(header)
+                stones = f.read(x_count + o_count)
+                board = [' '] * (size * size)
+                if len(stones) < x_count + o_count or any(cell >= len(board) for cell in stones):
+                    error = ValueError(f"malformed position {index}: stone outside a {size}x{size} board")
+                    if not skip_errors:
+                        raise error
+                    yield str(index), error
+                else:
+                    for cell in stones[:x_count]:
+                        board[cell] = AI_PLAYER
+                    for cell in stones[x_count:]:
+                        board[cell] = HUMAN_PLAYER
+                    yield str(index), GomokuGame(board=board, size=size,
+                                                 current_player=AI_PLAYER if to_move == 0 else HUMAN_PLAYER)
+                index += 1
+            return
+
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                yield parse_position_line(line, str(line_number))
+            except ValueError as exc:
+                if not skip_errors:
+                    raise
+                fields = line.split()
+                yield fields[0] if len(fields) == 4 else str(line_number), exc
+
+
+def write_binary_positions(path, positions):
+    """Writes (id, GomokuGame) pairs in the binary format; ids are not stored."""
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(BINARY_MAGIC)
+        for _, game in positions:
+            x_stones = bytes(i for i, spot in enumerate(game.board) if spot == AI_PLAYER)
+            o_stones = bytes(i for i, spot in enumerate(game.board) if spot == HUMAN_PLAYER)
+            to_move = 0 if game.current_player == AI_PLAYER else 1
+            f.write(BINARY_RECORD.pack(game.size, to_move, len(x_stones), len(o_stones)) + x_stones + o_stones)
+            count += 1
+    return count
+
+
+# --- Parallel analysis ---
+def bounded_map(executor, fn, items, window):
+    """
+    Like executor.map, but never holds more than `window` submitted tasks, so
+    an arbitrarily long input iterator is consumed at the pace results are
+    produced. Results come back in input order.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append(executor.submit(fn, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def analyse_position(args):
+    """
+    Pool worker: one fresh search of one position, summarised as a JSON-ready
+    dict. With iterations set the search runs exactly that many simulations
+    (seeded by seed), so reruns produce identical results. A finished game is
+    reported with its winner and no search; a failing search becomes
+    {'id', 'error'} instead of ending the whole run.
+    """
+    position_id = args[0]
+    try:
+        return _search_position(*args)
+    except Exception as exc:
+        return {'id': position_id, 'error': repr(exc)}
+
+
+def _search_position(position_id, board, current_player, size, time_limit_ms, min_simulations, top_n,
+                     iterations, seed):
+    from .mcts import MCTS_AI
+    from .time_control import FixedIterations
+
+    game = GomokuGame(board=board, current_player=current_player, size=size)
+    winner = game.check_winner()
+    if winner is not None:
+        return {'id': position_id, 'to_move': current_player, 'winner': winner, 'best_move': None,
+                'simulations': 0, 'time_ms': 0.0, 'top_moves': []}
+    start = time.monotonic()
+    time_control = FixedIterations(iterations) if iterations else None
+    ai = MCTS_AI(time_control=time_control, seed=seed)
+    move, root_node = ai.find_best_move(game, time_limit_ms, min_simulations)
+    children = sorted(root_node.children, key=lambda n: n.visits, reverse=True)[:top_n]
+    return {
+        'id': position_id,
+        'to_move': current_player,
+        'best_move': move,
+        'simulations': root_node.visits,
+        'time_ms': round((time.monotonic() - start) * 1000, 1),
+        'top_moves': [
+            {'move': c.move, 'visits': c.visits, 'win_rate': round(c.wins / c.visits * 100, 2) if c.visits else 0}
+            for c in children
+        ],
+    }
+
+
+def _analyse_job(job):
+    """Unreadable positions arrive as their finished error line."""
+    return job if isinstance(job, dict) else analyse_position(job)
+
+
+def analyse_file(in_path, out_path, time_limit_ms=1000, min_simulations=100, processes=None, top_n=5,
+                 iterations=None, seed=None):
+    """Analyses every position of in_path, writing one JSON line per position to out_path as results arrive."""
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = processes or os.cpu_count()
+    jobs = (
+        {'id': position_id, 'error': str(game)} if isinstance(game, ValueError) else
+        (position_id, game.board, game.current_player, game.size, time_limit_ms, min_simulations, top_n,
+         iterations, seed)
+        for position_id, game in read_positions(in_path, skip_errors=True)
+    )
+    count = 0
+    with ProcessPoolExecutor(processes) as executor, open(out_path, 'w') as out:
+        for result in bounded_map(executor, _analyse_job, jobs, 2 * processes):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyse a file of Gomoku positions in parallel.")
+    parser.add_argument('positions', help="text or binary position file")
+    parser.add_argument('output', help="JSON lines output file")
+    parser.add_argument('--time-ms', type=int, default=1000, help="search time per position")
+    parser.add_argument('--sims', type=int, default=100, help="minimum simulations per position")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--top', type=int, default=5, help="root moves reported per position")
+    parser.add_argument('--iterations', type=int, default=None,
+                        help="run exactly this many simulations per position, ignoring --time-ms")
+    parser.add_argument('--seed', type=int, default=None, help="search seed, for reproducible results")
+    parser.add_argument('--to-binary', action='store_true',
+                        help="only convert the positions file to the binary format at OUTPUT")
+    cli_args = parser.parse_args()
+
+    if cli_args.to_binary:
+        written = write_binary_positions(cli_args.output, read_positions(cli_args.positions))
+    else:
+        written = analyse_file(cli_args.positions, cli_args.output, cli_args.time_ms, cli_args.sims,
+                               cli_args.processes, cli_args.top, cli_args.iterations, cli_args.seed)
+    print(f"{written} positions written to {cli_args.output}")
@@ -0,0 +1,538 @@
+# gomoku/engine_server.py
+import asyncio
+import itertools
+import json
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from .profiles import DEFAULT_PROFILE, get_profile
+from .time_control import GameClock
+
+ENGINE_NAME = 'Gomoku MCTS'
+ENGINE_VERSION = '1.0'
+
+
+class EngineBusy(Exception):
+    """Raised when the worker pool already holds its maximum number of pending searches."""
+
+
+# --- Worker side ---
+class _WorkerState:
+    """Search state of every game routed to one worker: one engine (and its reusable tree) per game."""
+
+    def __init__(self, max_tree_bytes=None):
+        self.engines = {}
+        self.max_tree_bytes = max_tree_bytes
+
+    def handle(self, op, game_id, payload):
+        if op == 'drop':
+            self.engines.pop(game_id, None)
+            return None
+        board, current_player, size, win_len, time_limit_ms, min_simulations, level = payload
+        ai = self.engines.get(game_id)
+        if ai is None:
+            ai = self.engines[game_id] = get_profile(level).create_engine()
+            ai.max_tree_bytes = self.max_tree_bytes
+        game = GomokuGame(board=board, current_player=current_player, size=size, win_len=win_len)
+        start = time.monotonic()
+        move, root_node = ai.find_best_move(game, time_limit_ms, min_simulations)
+        children = sorted(root_node.children, key=lambda n: n.visits, reverse=True)[:5]
+        return {
+            'move': move,
+            'simulations': root_node.visits,
+            'time_ms': round((time.monotonic() - start) * 1000, 1),
+            'tree_nodes': ai.last_search_stats.get('tree_nodes', 0),
+            'tree_bytes': ai.last_search_stats.get('tree_bytes', 0),
+            'top_moves': [
+                {'move': c.move, 'visits': c.visits, 'win_rate': c.wins / c.visits if c.visits else 0}
+                for c in children
+            ],
+        }
+
+
+def _worker_main(requests, responses, max_tree_bytes):
+    state = _WorkerState(max_tree_bytes)
+    for request_id, op, game_id, payload in iter(requests.get, None):
+        try:
+            responses.put((request_id, state.handle(op, game_id, payload), None))
+        except Exception as exc:  # Report to the caller instead of killing the worker
+            responses.put((request_id, None, repr(exc)))
+
+
+class EngineWorkerPool:
+    """
+    Runs searches for many concurrent games on a fixed set of worker processes.
+    Each game is pinned to one worker so its search tree survives between
+    moves. At most max_pending searches may be queued or running; beyond that
+    submit raises EngineBusy so callers can shed load. max_tree_bytes caps the
+    search tree kept per game, which bounds memory per worker at roughly
+    games x max_tree_bytes. processes=0 runs every search on a single
+    in-process thread, which is what tests and the stdio protocol use.
+    """
+
+    def __init__(self, processes=None, max_pending=64, max_tree_bytes=None):
+        self.processes = multiprocessing.cpu_count() if processes is None else processes
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._request_ids = itertools.count()
+        self._assignment = {}
+        self._load = [0] * max(self.processes, 1)
+
+        if self.processes == 0:
+            self._inline_state = _WorkerState(max_tree_bytes)
+            self._inline = ThreadPoolExecutor(max_workers=1)
+            return
+        self._responses = multiprocessing.Queue()
+        self._queues, self._workers = [], []
+        for _ in range(self.processes):
+            requests = multiprocessing.Queue()
+            worker = multiprocessing.Process(target=_worker_main, args=(requests, self._responses, max_tree_bytes),
+                                             daemon=True)
+            worker.start()
+            self._queues.append(requests)
+            self._workers.append(worker)
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, game_id, game_state, time_limit_ms, min_simulations, level=DEFAULT_PROFILE):
+        """
+        Queues a search of game_state with the engine profile named level;
+        returns a concurrent.futures.Future of the result dict.
+        """
+        payload = (list(game_state.board), game_state.current_player, game_state.size, game_state.win_len,
+                   time_limit_ms, min_simulations, level)
+        return self._submit('think', game_id, payload)
+
+    def drop(self, game_id):
+        """Forgets the search state of a finished game."""
+        future = self._submit('drop', game_id, None, force=True)
+        with self._lock:
+            index = self._assignment.pop(game_id, None)
+            if index is not None:
+                self._load[index] -= 1
+        return future
+
+    def _submit(self, op, game_id, payload, force=False):
+        future = Future()
+        with self._lock:
+            if not force and len(self._pending) >= self.max_pending:
+                raise EngineBusy(f"{len(self._pending)} searches pending")
+            request_id = next(self._request_ids)
+            self._pending[request_id] = future
+            index = self._assignment.get(game_id)
+            if index is None:
+                index = self._load.index(min(self._load))
+                if op != 'drop':
+                    self._assignment[game_id] = index
+                    self._load[index] += 1
+        if self.processes == 0:
+            self._inline.submit(self._run_inline, request_id, op, game_id, payload)
+        else:
+            self._queues[index].put((request_id, op, game_id, payload))
+        return future
+
+    def _run_inline(self, request_id, op, game_id, payload):
+        try:
+            result, error = self._inline_state.handle(op, game_id, payload), None
+        except Exception as exc:
+            result, error = None, repr(exc)
+        self._resolve(request_id, result, error)
+
+    def _read_responses(self):
+        for request_id, result, error in iter(self._responses.get, None):
+            self._resolve(request_id, result, error)
+
+    def _resolve(self, request_id, result, error):
+        with self._lock:
+            future = self._pending.pop(request_id, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(result)
+
+    def close(self):
+        if self.processes == 0:
+            self._inline.shutdown(wait=False, cancel_futures=True)
+            return
+        for requests in self._queues:
+            requests.put(None)
+        for worker in self._workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+        self._responses.put(None)
+
+
+# --- Game sessions ---
+class GameSession:
+    """Board and budget of one game served by the engine; the engine always plays AI_PLAYER."""
+
+    def __init__(self, game_id, size=15, win_len=5, time_limit_ms=1000, min_simulations=1, level=DEFAULT_PROFILE):
+        self.game_id = game_id
+        self.game = GomokuGame(size=size, win_len=win_len, current_player=HUMAN_PLAYER)
+        self.time_limit_ms = time_limit_ms
+        self.min_simulations = min_simulations
+        self.profile = get_profile(level)
+        # Load this game puts on the pool, see EngineProfile.cpu_cost
+        self.cpu_cost = self.profile.cpu_cost(time_limit_ms, min_simulations)
+        self.clock = None
+
+    def play(self, move, player):
+        if isinstance(move, bool) or not isinstance(move, int):
+            raise ValueError(f"move must be a cell index, got {move!r}")
+        if not (0 <= move < len(self.game.board)) or self.game.board[move] != ' ':
+            raise ValueError(f"illegal move {move}")
+        self.game.make_move(move, player)
+        self.game.current_player = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+
+    def search_budget(self):
+        """
+        (time_limit_ms, min_simulations) of the next engine move: the level's
+        budget, never more than the game clock hands out for this move.
+        """
+        time_limit_ms, min_simulations = self.profile.budget(self.time_limit_ms, self.min_simulations)
+        if self.clock is not None:
+            time_limit_ms = min(time_limit_ms, self.clock.allocate(self.game))
+        return time_limit_ms, min_simulations
+
+    def submit_search(self, pool):
+        time_limit_ms, min_simulations = self.search_budget()
+        return pool.submit(self.game_id, self.game, time_limit_ms, min_simulations, self.profile.name)
+
+    def record_engine_move(self, result):
+        self.play(result['move'], AI_PLAYER)
+        if self.clock is not None:
+            self.clock.spend(result['time_ms'])
+
+
+# --- Gomocup stdin/stdout protocol ---
+class GomocupProtocol:
+    """
+    Single-game Gomocup "pbrain" protocol over text streams: START, RESTART,
+    BEGIN, TURN, BOARD/DONE, TAKEBACK, INFO, ABOUT and END. Coordinates are
+    "x,y" with x the column.
+    """
+
+    def __init__(self, pool, stdin=sys.stdin, stdout=sys.stdout):
+        self.pool = pool
+        self.stdin = stdin
+        self.stdout = stdout
+        self.session = None
+        self.info = {'timeout_turn': 5000, 'timeout_match': 0, 'time_left': 0}
+
+    def _send(self, line):
+        self.stdout.write(line + '\n')
+        self.stdout.flush()
+
+    def _parse_xy(self, text):
+        x, y = (int(v) for v in text.split(',')[:2])
+        size = self.session.game.size
+        if not (0 <= x < size and 0 <= y < size):
+            raise ValueError(f"coordinates out of range: {text}")
+        return y * size + x
+
+    def _new_session(self, size):
+        if self.session is not None:
+            self.pool.drop(self.session.game_id)
+        self.session = GameSession('stdio', size=size)
+        self._apply_info()
+
+    def _apply_info(self):
+        # Keep a safety margin for protocol and process overhead
+        self.session.time_limit_ms = max(50, int(self.info['timeout_turn']) - 100)
+        if int(self.info['timeout_match']) > 0:
+            remaining = int(self.info['time_left']) or int(self.info['timeout_match'])
+            self.session.clock = GameClock(remaining)
+
+    def _think_and_reply(self):
+        session = self.session
+        session.game.current_player = AI_PLAYER
+        result = session.submit_search(self.pool).result()
+        session.record_engine_move(result)
+        row, col = divmod(result['move'], session.game.size)
+        self._send(f"{col},{row}")
+
+    def run(self):
+        lines = iter(self.stdin.readline, '')
+        for raw in lines:
+            parts = raw.strip().split(None, 1)
+            if not parts:
+                continue
+            command, arg = parts[0].upper(), (parts[1] if len(parts) > 1 else '')
+            try:
+                if command == 'START':
+                    size = int(arg)
+                    if size < 5:
+                        self._send("ERROR unsupported board size")
+                        continue
+                    self._new_session(size)
+                    self._send("OK")
+                elif command == 'RECTSTART':
+                    self._send("ERROR rectangular boards are not supported")
+                elif command == 'RESTART':
+                    self._new_session(self.session.game.size)
+                    self._send("OK")
+                elif command == 'INFO':
+                    key, _, value = arg.partition(' ')
+                    self.info[key.lower()] = value
+                    if self.session is not None and key.lower() in ('timeout_turn', 'timeout_match', 'time_left'):
+                        self._apply_info()
+                elif command == 'BEGIN':
+                    self._think_and_reply()
+                elif command == 'TURN':
+                    self.session.play(self._parse_xy(arg), HUMAN_PLAYER)
+                    self._think_and_reply()
+                elif command == 'BOARD':
+                    self._new_session(self.session.game.size)
+                    for entry in lines:
+                        entry = entry.strip()
+                        if entry.upper() == 'DONE':
+                            break
+                        x, y, field = (int(v) for v in entry.split(','))
+                        move = y * self.session.game.size + x
+                        self.session.play(move, AI_PLAYER if field == 1 else HUMAN_PLAYER)
+                    self._think_and_reply()
+                elif command == 'TAKEBACK':
+                    move = self._parse_xy(arg)
+                    # unmake_move restores last_move from a stack, so only the latest move can go
+                    if move != self.session.game.last_move:
+                        raise ValueError("only the last move can be taken back")
+                    self.session.game.unmake_move(move)
+                    self._send("OK")
+                elif command == 'ABOUT':
+                    self._send(f'name="{ENGINE_NAME}", version="{ENGINE_VERSION}"')
+                elif command == 'END':
+                    break
+                else:
+                    self._send(f"UNKNOWN command {command}")
+            except Exception as exc:  # Report and keep serving; the manager decides what to do
+                self._send(f"ERROR {exc}")
+
+
+# --- asyncio JSON-lines socket server ---
+class EngineServer:
+    """
+    Local TCP server speaking one JSON object per line. Requests carry an
+    optional "id" echoed in the reply, a "game" id and a "cmd":
+      new   {size, win_len, time_limit_ms, min_simulations,  start/replace a game
+             game_time_ms, increment_ms, level}
+      move  {move}                                           opponent plays move
+      think {}                                               engine plays, returns its move
+      end   {}                                               drop the game
+    Requests on one connection are handled concurrently; requests of the
+    same game are serialised. When the pool is saturated "think" replies
+    {"error": "busy"} immediately instead of queueing without bound.
+    "level" names an engine profile (gomoku.profiles). With a capacity set,
+    "new" is refused with {"error": "busy"} once the summed cpu_cost of the
+    open games would exceed it. The cost follows each game's effective time
+    and simulation budget, so cheap levels fit many games per core.
+    """
+
+    def __init__(self, pool, host='127.0.0.1', port=0, capacity=None):
+        self.pool = pool
+        self.host = host
+        self.port = port
+        self.capacity = capacity
+        self.sessions = {}
+        self._game_locks = {}
+        self._server = None
+        self._connections = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        while self._connections:
+            await asyncio.sleep(0.01)
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self._connections.add(writer)
+
+        async def respond(line):
+            request = {}
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    request = {}
+                    raise ValueError("request must be a JSON object")
+                reply = await self._dispatch(request)
+            except Exception as exc:  # Every request gets a reply, or the client would wait forever
+                reply = {'error': str(exc) or type(exc).__name__}
+            reply['id'] = request.get('id')
+            async with write_lock:
+                writer.write((json.dumps(reply) + '\n').encode())
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(respond(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def load(self):
+        """Summed cpu_cost of the open games."""
+        return sum(session.cpu_cost for session in self.sessions.values())
+
+    async def _dispatch(self, request):
+        game_id = request['game']
+        command = request['cmd']
+        lock = self._game_locks.setdefault(game_id, asyncio.Lock())
+        async with lock:
+            if command == 'new':
+                session = GameSession(
+                    game_id,
+                    size=request.get('size', 15),
+                    win_len=request.get('win_len', 5),
+                    time_limit_ms=request.get('time_limit_ms', 1000),
+                    min_simulations=request.get('min_simulations', 1),
+                    level=request.get('level', DEFAULT_PROFILE),
+                )
+                replaced = self.sessions.get(game_id)
+                if self.capacity is not None:
+                    load = self.load() - (replaced.cpu_cost if replaced else 0)
+                    if load + session.cpu_cost > self.capacity:
+                        return {'error': 'busy'}
+                if replaced is not None:
+                    self.pool.drop(game_id)  # The worker's engine (tree, level) belongs to the old game
+                self.sessions[game_id] = session
+                if request.get('game_time_ms'):
+                    self.sessions[game_id].clock = GameClock(request['game_time_ms'], request.get('increment_ms', 0))
+                return {'ok': True}
+            session = self.sessions.get(game_id)
+            if session is None:
+                raise KeyError(f"unknown game {game_id}")
+            if command in ('move', 'think'):
+                winner = session.game.check_winner()
+                if winner is not None:
+                    return {'error': 'game over', 'winner': winner}
+            if command == 'move':
+                session.play(request['move'], HUMAN_PLAYER)
+                return {'ok': True, 'winner': session.game.check_winner()}
+            if command == 'think':
+                session.game.current_player = AI_PLAYER
+                try:
+                    future = session.submit_search(self.pool)
+                except EngineBusy:
+                    return {'error': 'busy'}
+                result = await asyncio.wrap_future(future)
+                session.record_engine_move(result)
+                result['winner'] = session.game.check_winner()
+                return result
+            if command == 'end':
+                del self.sessions[game_id]
+                self._game_locks.pop(game_id, None)
+                self.pool.drop(game_id)
+                return {'ok': True}
+            raise ValueError(f"unknown command {command}")
+
+
+class EngineClient:
+    """Minimal asyncio client for EngineServer, used as a local stand-in for real front ends."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+        self._ids = itertools.count()
+        self._waiting = {}
+        self._listener = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._listener = asyncio.ensure_future(self._listen())
+        return self
+
+    async def _listen(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self._waiting.pop(reply.get('id'), None)
+            if future is not None:
+                future.set_result(reply)
+
+    async def request(self, game, cmd, **fields):
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write((json.dumps(dict(fields, id=request_id, game=game, cmd=cmd)) + '\n').encode())
+        await self._writer.drain()
+        return await future
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._listener.cancel()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Headless Gomoku engine.")
+    parser.add_argument('--mode', choices=('gomocup', 'socket'), default='gomocup')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--max-tree-mb', type=float, default=None, help="search tree budget per game")
+    parser.add_argument('--games-per-core', type=float, default=4.0,
+                        help="open games admitted per worker process, counted as full-strength games "
+                             "searching 1000 ms per move")
+    cli_args = parser.parse_args(argv)
+    max_tree_bytes = int(cli_args.max_tree_mb * 1024 * 1024) if cli_args.max_tree_mb else None
+
+    if cli_args.mode == 'gomocup':
+        engine_pool = EngineWorkerPool(processes=0, max_tree_bytes=max_tree_bytes)
+        GomocupProtocol(engine_pool).run()
+        engine_pool.close()
+        return
+
+    engine_pool = EngineWorkerPool(cli_args.processes, cli_args.max_pending, max_tree_bytes)
+
+    async def serve():
+        capacity = cli_args.games_per_core * max(engine_pool.processes, 1)
+        server = await EngineServer(engine_pool, cli_args.host, cli_args.port, capacity).start()
+        print(f"Listening on {server.host}:{server.port}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    finally:
+        engine_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# gomoku/game.py
+
+# Player constants
+AI_PLAYER = 'X'
+HUMAN_PLAYER = 'O'
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Geometry tables only depend on (size, win_len), so every clone shares them.
+_WIN_LINES_CACHE = {}
+_NEIGHBOURS_CACHE = {}
+
+
+def _win_lines_for(size, win_len):
+    key = (size, win_len)
+    if key not in _WIN_LINES_CACHE:
+        lines = []
+        for r in range(size):
+            for c in range(size - win_len + 1):
+                lines.append([r * size + c + i for i in range(win_len)])
+        for c in range(size):
+            for r in range(size - win_len + 1):
+                lines.append([(r + i) * size + c for i in range(win_len)])
+        for r in range(size - win_len + 1):
+            for c in range(size - win_len + 1):
+                lines.append([(r + i) * size + (c + i) for i in range(win_len)])
+        for r in range(win_len - 1, size):
+            for c in range(size - win_len + 1):
+                lines.append([(r - i) * size + (c + i) for i in range(win_len)])
+        _WIN_LINES_CACHE[key] = lines
+    return _WIN_LINES_CACHE[key]
+
+
+def _neighbours_for(size):
+    if size not in _NEIGHBOURS_CACHE:
+        table = []
+        for pos in range(size * size):
+            r, c = divmod(pos, size)
+            table.append(tuple(
+                nr * size + nc
+                for nr in (r - 1, r, r + 1)
+                for nc in (c - 1, c, c + 1)
+                if (nr, nc) != (r, c) and 0 <= nr < size and 0 <= nc < size
+            ))
+        _NEIGHBOURS_CACHE[size] = table
+    return _NEIGHBOURS_CACHE[size]
+
+
+class Frontier:
+    """
+    Set of cells that also supports an O(1) uniform random pick: the cells
+    live in a list, and a dict maps each cell to its list position so
+    discard can swap the last cell into the hole.
+    """
+    __slots__ = ('cells', 'index')
+
+    def __init__(self, cells=()):
+        self.cells = []
+        self.index = {}
+        for cell in cells:
+            self.add(cell)
+
+    def add(self, cell):
+        if cell not in self.index:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        position = self.index.pop(cell, None)
+        if position is None:
+            return
+        last = self.cells.pop()
+        if position < len(self.cells):
+            self.cells[position] = last
+            self.index[last] = position
+
+    def choice(self, rng):
+        return rng.choice(self.cells)
+
+    def copy(self):
+        clone = Frontier.__new__(Frontier)
+        clone.cells = list(self.cells)
+        clone.index = dict(self.index)
+        return clone
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __eq__(self, other):
+        return set(self.cells) == set(other)
+
+    __hash__ = None
+
+
+class GomokuGame:
+    def __init__(self, board=None, current_player=HUMAN_PLAYER, size=9, win_len=5):
+        self.size = size
+        self.win_len = win_len
+        self.board = [' ' for _ in range(size * size)] if board is None else list(board)
+        self.current_player = current_player
+        self.last_move = -1
+        self.move_history = []
+        self._neighbours = _neighbours_for(size)
+
+        # Incrementally maintained search helpers:
+        #   frontier  - empty cells adjacent to at least one stone
+        #   win_cells - per player, empty cells that would complete a five
+        self.empty_count = 0
+        self.frontier = Frontier()
+        self.win_cells = {AI_PLAYER: set(), HUMAN_PLAYER: set()}
+        for pos, spot in enumerate(self.board):
+            if spot != ' ':
+                continue
+            self.empty_count += 1
+            if any(self.board[n] != ' ' for n in self._neighbours[pos]):
+                self.frontier.add(pos)
+            for player in (AI_PLAYER, HUMAN_PLAYER):
+                if self._completes_line(pos, player):
+                    self.win_cells[player].add(pos)
+
+    def _count_through(self, pos, player, dr, dc):
+        """Length of the run of `player` stones through pos along (dr, dc), counting pos itself."""
+        size, board = self.size, self.board
+        r, c = divmod(pos, size)
+        count = 1
+        for sign in (1, -1):
+            for i in range(1, self.win_len):
+                nr, nc = r + sign * i * dr, c + sign * i * dc
+                if 0 <= nr < size and 0 <= nc < size and board[nr * size + nc] == player:
+                    count += 1
+                else:
+                    break
+        return count
+
+    def _completes_line(self, pos, player):
+        for dr, dc in DIRECTIONS:
+            if self._count_through(pos, player, dr, dc) >= self.win_len:
+                return True
+        return False
+
+    def _line_cells(self, pos, dr, dc):
+        """Empty cells within win_len - 1 steps of pos along (dr, dc), both ways."""
+        size, board = self.size, self.board
+        r, c = divmod(pos, size)
+        cells = []
+        for sign in (1, -1):
+            for i in range(1, self.win_len):
+                nr, nc = r + sign * i * dr, c + sign * i * dc
+                if not (0 <= nr < size and 0 <= nc < size):
+                    break
+                n = nr * size + nc
+                if board[n] == ' ':
+                    cells.append(n)
+        return cells
+
+    def is_unwinnable(self, player):
+        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+        # Only the full (non fast_check) winner test needs the win lines, so they are built on first use
+        for line in _win_lines_for(self.size, self.win_len):
+            if not any(self.board[pos] == opponent for pos in line):
+                return False
+        return True
+
+    def get_legal_moves(self):
+        return [i for i, spot in enumerate(self.board) if spot == ' ']
+
+    def make_move(self, move, player):
+        self.board[move] = player
+        self.move_history.append(self.last_move)
+        self.last_move = move
+        self.empty_count -= 1
+
+        self.frontier.discard(move)
+        for n in self._neighbours[move]:
+            if self.board[n] == ' ':
+                self.frontier.add(n)
+
+        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+        own_wins, opp_wins = self.win_cells[player], self.win_cells[opponent]
+        own_wins.discard(move)
+        # A stone on an empty cell is never part of an opponent run, so the
+        # opponent only loses `move` itself as a win cell.
+        opp_wins.discard(move)
+        for dr, dc in DIRECTIONS:
+            for cell in self._line_cells(move, dr, dc):
+                if cell not in own_wins and self._count_through(cell, player, dr, dc) >= self.win_len:
+                    own_wins.add(cell)
+
+    def unmake_move(self, move):
+        """Take back `move`, restoring the board and all incremental sets."""
+        player = self.board[move]
+        self.board[move] = ' '
+        self.last_move = self.move_history.pop() if self.move_history else -1
+        self.empty_count += 1
+
+        board = self.board
+        for n in self._neighbours[move]:
+            if n in self.frontier and not any(board[m] != ' ' for m in self._neighbours[n]):
+                self.frontier.discard(n)
+        if any(board[n] != ' ' for n in self._neighbours[move]):
+            self.frontier.add(move)
+
+        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+        own_wins, opp_wins = self.win_cells[player], self.win_cells[opponent]
+        for dr, dc in DIRECTIONS:
+            for cell in self._line_cells(move, dr, dc):
+                if cell in own_wins and not self._completes_line(cell, player):
+                    own_wins.discard(cell)
+                if cell not in opp_wins and self._count_through(cell, opponent, dr, dc) >= self.win_len:
+                    opp_wins.add(cell)
+        for p in (AI_PLAYER, HUMAN_PLAYER):
+            if self._completes_line(move, p):
+                self.win_cells[p].add(move)
+
+    def clone(self):
+        cloned_game = GomokuGame.__new__(GomokuGame)
+        cloned_game.size = self.size
+        cloned_game.win_len = self.win_len
+        cloned_game.board = list(self.board)
+        cloned_game.current_player = self.current_player
+        cloned_game.last_move = self.last_move
+        cloned_game.move_history = list(self.move_history)
+        cloned_game._neighbours = self._neighbours
+        cloned_game.empty_count = self.empty_count
+        cloned_game.frontier = self.frontier.copy()
+        cloned_game.win_cells = {p: set(cells) for p, cells in self.win_cells.items()}
+        return cloned_game
+
+    def check_winner(self, fast_check=False):
+        if self.last_move != -1:
+            player = self.board[self.last_move]
+            x, y = self.last_move % self.size, self.last_move // self.size
+            directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
+            for dx, dy in directions:
+                count = 1
+                for i in range(1, self.win_len):
+                    nx, ny = x + i * dx, y + i * dy
+                    if 0 <= nx < self.size and 0 <= ny < self.size and self.board[ny * self.size + nx] == player: count += 1
+                    else: break
+                for i in range(1, self.win_len):
+                    nx, ny = x - i * dx, y - i * dy
+                    if 0 <= nx < self.size and 0 <= ny < self.size and self.board[ny * self.size + nx] == player: count += 1
+                    else: break
+                if count >= self.win_len:
+                    return player
+
+        if self.empty_count == 0:
+            return 'draw'
+
+        if fast_check:
+            return None
+
+        if self.is_unwinnable(AI_PLAYER) and self.is_unwinnable(HUMAN_PLAYER):
+            return 'draw'
+
+        return None
\ No newline at end of file
@@ -0,0 +1,240 @@
+# gomoku/game_archive.py
+import os
+import struct
+import time
+
+from .game import AI_PLAYER, HUMAN_PLAYER
+
+# --- On-disk format ---
+# <base>.dat is an append-only sequence of game records:
+#   RECORD_MAGIC, payload length, then the payload:
+#   GAME_HEADER (timestamp, size, win_len, result, first player, time limit,
+#   min simulations, heuristic name length, move count), the heuristic name,
+#   one byte per move (the cell index), and per move an analysis flag byte
+#   followed, for analysed moves, by ANALYSIS_HEADER and n ANALYSIS_MOVE.
+# <base>.idx is an append-only array of fixed-width INDEX_ENTRY records, one per
+# game, pointing into the .dat file. It is written after the game record, so a
+# crash can at worst leave an unindexed (ignored) record behind, or a partial
+# index entry, which the next append truncates away. Entries that do not point
+# at a game record are skipped when reading.
+RECORD_MAGIC = b'GREC'
+RECORD_PREFIX = struct.Struct('<4sI')
+GAME_HEADER = struct.Struct('<dBBBBIIBH')
+ANALYSIS_HEADER = struct.Struct('<IB')
+ANALYSIS_MOVE = struct.Struct('<BIf')
+INDEX_ENTRY = struct.Struct('<QdBBHBII')
+
+RESULT_DRAW, RESULT_AI_WIN, RESULT_HUMAN_WIN = 0, 1, 2
+RESULT_CODES = {'draw': RESULT_DRAW, AI_PLAYER: RESULT_AI_WIN, HUMAN_PLAYER: RESULT_HUMAN_WIN}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+HEURISTIC_CODES = {'pattern': 0, 'random': 1, 'deep': 2}
+OTHER_HEURISTIC = 255
+
+
+class IndexEntry:
+    __slots__ = ('offset', 'timestamp', 'result', 'size', 'move_count', 'heuristic', 'time_limit_ms',
+                 'min_simulations')
+
+    def __init__(self, offset, timestamp, result, size, move_count, heuristic, time_limit_ms, min_simulations):
+        self.offset = offset
+        self.timestamp = timestamp
+        self.result = result
+        self.size = size
+        self.move_count = move_count
+        self.heuristic = heuristic
+        self.time_limit_ms = time_limit_ms
+        self.min_simulations = min_simulations
+
+    @property
+    def winner(self):
+        return RESULT_NAMES[self.result]
+
+
+def _player_name(player):
+    return "AI" if player == AI_PLAYER else "Human"
+
+
+class GameArchive:
+    """
+    Append-only store of finished games. Saving a game appends one record and
+    one index entry, so the cost does not grow with the archive; the index is
+    small enough to scan for lookups by date, result and settings.
+    """
+
+    def __init__(self, base_path):
+        self.data_path = base_path + '.dat'
+        self.index_path = base_path + '.idx'
+
+    def append(self, game_log, winner, settings, size=9, win_len=5, timestamp=None):
+        """Appends a finished game (a GUI game_log) and returns its IndexEntry."""
+        if size * size > 256:
+            raise ValueError("one-byte move encoding supports boards up to 16x16")
+        timestamp = time.time() if timestamp is None else timestamp
+        heuristic = settings.get('heuristic', 'pattern')
+        heuristic_bytes = heuristic.encode()
+        first_player = 0 if game_log and game_log[0]['player'] == 'AI' else 1
+
+        parts = [
+            GAME_HEADER.pack(timestamp, size, win_len, RESULT_CODES[winner], first_player,
+                             settings.get('time_limit_ms', 0), settings.get('min_simulations', 0),
+                             len(heuristic_bytes), len(game_log)),
+            heuristic_bytes,
+            bytes(entry['move'] for entry in game_log),
+        ]
+        for entry in game_log:
+            analysis = entry.get('analysis')
+            if analysis is None:
+                parts.append(b'\x00')
+                continue
+            top_moves = analysis.get('top_moves', [])[:255]
+            parts.append(b'\x01' + ANALYSIS_HEADER.pack(analysis.get('total_simulations', 0), len(top_moves)))
+            for move_data in top_moves:
+                parts.append(ANALYSIS_MOVE.pack(move_data['move'], move_data['visits'], move_data['win_rate']))
+        payload = b''.join(parts)
+
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(RECORD_PREFIX.pack(RECORD_MAGIC, len(payload)) + payload)
+        entry = IndexEntry(offset, timestamp, RESULT_CODES[winner], size, len(game_log),
+                           HEURISTIC_CODES.get(heuristic, OTHER_HEURISTIC),
+                           settings.get('time_limit_ms', 0), settings.get('min_simulations', 0))
+        # Drop a torn trailing entry first, or it would misalign every entry after it
+        try:
+            index_size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            index_size = 0
+        if index_size % INDEX_ENTRY.size:
+            os.truncate(self.index_path, index_size - index_size % INDEX_ENTRY.size)
+        with open(self.index_path, 'ab') as f:
+            f.write(INDEX_ENTRY.pack(entry.offset, entry.timestamp, entry.result, entry.size, entry.move_count,
+                                     entry.heuristic, entry.time_limit_ms, entry.min_simulations))
+        return entry
+
+    def index(self):
+        """Yields every valid IndexEntry in archive order."""
+        if not (os.path.exists(self.index_path) and os.path.exists(self.data_path)):
+            return
+        with open(self.index_path, 'rb') as f, open(self.data_path, 'rb') as data:
+            data_size = os.fstat(data.fileno()).st_size
+            while True:
+                raw = f.read(INDEX_ENTRY.size)
+                if len(raw) < INDEX_ENTRY.size:  # End of file, or a torn trailing write
+                    return
+                entry = IndexEntry(*INDEX_ENTRY.unpack(raw))
+                if _points_at_record(entry, data, data_size):
+                    yield entry
+
+    def find(self, since=None, until=None, winner=None, time_limit_ms=None, min_simulations=None, heuristic=None):
+        """Index entries matching every given filter; since/until are Unix timestamps."""
+        result = RESULT_CODES[winner] if winner is not None else None
+        heuristic_code = HEURISTIC_CODES.get(heuristic, OTHER_HEURISTIC) if heuristic is not None else None
+        for entry in self.index():
+            if since is not None and entry.timestamp < since:
+                continue
+            if until is not None and entry.timestamp >= until:
+                continue
+            if result is not None and entry.result != result:
+                continue
+            if time_limit_ms is not None and entry.time_limit_ms != time_limit_ms:
+                continue
+            if min_simulations is not None and entry.min_simulations != min_simulations:
+                continue
+            if heuristic_code is not None and entry.heuristic != heuristic_code:
+                continue
+            yield entry
+
+    def last_entry(self):
+        """The newest valid IndexEntry, or None."""
+        if not (os.path.exists(self.index_path) and os.path.exists(self.data_path)):
+            return None
+        with open(self.index_path, 'rb') as f, open(self.data_path, 'rb') as data:
+            data_size = os.fstat(data.fileno()).st_size
+            for position in range(os.fstat(f.fileno()).st_size // INDEX_ENTRY.size - 1, -1, -1):
+                f.seek(position * INDEX_ENTRY.size)
+                entry = IndexEntry(*INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size)))
+                if _points_at_record(entry, data, data_size):
+                    return entry
+        return None
+
+    def read_game(self, entry):
+        """
+        Decodes the game an IndexEntry points to into a dict with its settings
+        and GUI-style log. Raises ValueError if there is no game record there.
+        """
+        with open(self.data_path, 'rb') as f:
+            if not _points_at_record(entry, f, os.fstat(f.fileno()).st_size):
+                raise ValueError(f"no game record at offset {entry.offset}")
+            f.seek(entry.offset)
+            _, length = RECORD_PREFIX.unpack(f.read(RECORD_PREFIX.size))
+            return self._decode(f.read(length))
+
+    def iter_games(self, entries=None):
+        """Yields decoded games one at a time, for all games or the given index entries, skipping invalid ones."""
+        for entry in (self.index() if entries is None else entries):
+            try:
+                yield self.read_game(entry)
+            except ValueError:
+                continue
+
+    def _decode(self, payload):
+        (timestamp, size, win_len, result, first_player, time_limit_ms, min_simulations,
+         heuristic_len, move_count) = GAME_HEADER.unpack_from(payload, 0)
+        pos = GAME_HEADER.size
+        heuristic = payload[pos:pos + heuristic_len].decode()
+        pos += heuristic_len
+        moves = payload[pos:pos + move_count]
+        pos += move_count
+
+        player = AI_PLAYER if first_player == 0 else HUMAN_PLAYER
+        log = []
+        for turn, move in enumerate(moves, 1):
+            entry = {"turn": turn, "player": _player_name(player), "move": move}
+            flag = payload[pos]
+            pos += 1
+            if flag:
+                total_simulations, top_count = ANALYSIS_HEADER.unpack_from(payload, pos)
+                pos += ANALYSIS_HEADER.size
+                top_moves = []
+                for _ in range(top_count):
+                    top_move, visits, win_rate = ANALYSIS_MOVE.unpack_from(payload, pos)
+                    pos += ANALYSIS_MOVE.size
+                    top_moves.append({"move": top_move, "win_rate": win_rate, "visits": visits})
+                entry["analysis"] = {"total_simulations": total_simulations, "top_moves": top_moves}
+            log.append(entry)
+            player = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+
+        return {
+            'timestamp': timestamp,
+            'size': size,
+            'win_len': win_len,
+            'winner': RESULT_NAMES[result],
+            'settings': {'time_limit_ms': time_limit_ms, 'min_simulations': min_simulations, 'heuristic': heuristic},
+            'log': log,
+        }
+
+    def stats(self):
+        """Win/loss/total per time limit (seconds, as a string key), derived from the index."""
+        stats = {}
+        for entry in self.index():
+            add_result_to_stats(stats, entry.time_limit_ms, entry.winner)
+        return stats
+
+
+def _points_at_record(entry, data, data_size):
+    """Whether entry has a known result and points at a whole game record in the open .dat file."""
+    if entry.result not in RESULT_NAMES or entry.offset + RECORD_PREFIX.size > data_size:
+        return False
+    data.seek(entry.offset)
+    magic, length = RECORD_PREFIX.unpack(data.read(RECORD_PREFIX.size))
+    return magic == RECORD_MAGIC and entry.offset + RECORD_PREFIX.size + length <= data_size
+
+
+def add_result_to_stats(stats, time_limit_ms, winner):
+    """Folds one finished game into a stats dict in place."""
+    time_key = str(time_limit_ms / 1000)
+    if time_key not in stats: stats[time_key] = {'wins': 0, 'losses': 0, 'total': 0}
+    stats[time_key]['total'] += 1
+    if winner == HUMAN_PLAYER:
+        stats[time_key]['losses'] += 1
+    elif winner == AI_PLAYER:
+        stats[time_key]['wins'] += 1
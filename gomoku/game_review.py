@@ -0,0 +1,154 @@
+# gomoku/game_review.py
+import itertools
+import json
+
+from .game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from .batch_analysis import analyse_position, bounded_map
+from .game_archive import GameArchive
+
+BOARD_SIZE = 9
+TOP_MOVES_KEPT = 5
+# Root children with fewer visits than this have too noisy a win rate to judge a move by
+MIN_REVIEW_VISITS = 10
+
+
+def iter_game_logs(paths):
+    """
+    Yields (source, log, size) one game at a time; size is None when the
+    source does not record it. A .dat file is a GameArchive, a .jsonl file
+    holds one game log per line, any other file is a single JSON game log.
+    """
+    for path in paths:
+        if path.endswith('.dat'):
+            archive = GameArchive(path[:-len('.dat')])
+            for entry in archive.index():
+                yield f"{path}@{entry.offset}", archive.read_game(entry)['log'], entry.size
+            continue
+        with open(path, 'r') as f:
+            if path.endswith('.jsonl'):
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{path}:{line_number}", json.loads(line), None
+            else:
+                yield path, json.load(f), None
+
+
+def _player_of(entry):
+    return AI_PLAYER if entry['player'] == 'AI' else HUMAN_PLAYER
+
+
+def _review_jobs(games, size, time_limit_ms, min_simulations):
+    """Yields ((game_no, source, log), analysis job) for every position of every game, in order."""
+    for game_no, (source, log, game_size) in enumerate(games):
+        game_size = game_size or size
+        game = GomokuGame(size=game_size)
+        for turn_index, entry in enumerate(log):
+            player = _player_of(entry)
+            game.current_player = player
+            # Ask for every root child so the played move's own statistics are available
+            job = (f"{game_no}:{turn_index}", list(game.board), player, game_size,
+                   time_limit_ms, min_simulations, game_size * game_size, None, None)
+            yield (game_no, source, log), job
+            game.make_move(entry['move'], player)
+
+
+def annotate_game(log, analyses, blunder_drop=20.0, mistake_drop=10.0):
+    """
+    Returns a copy of log where every entry carries a "review": the engine's
+    preferred move, the win rates (percent, for the player to move) of the best
+    and the played move, and a verdict from the drop between them. A win rate
+    backed by fewer than MIN_REVIEW_VISITS simulations is left as None, and a
+    move without both win rates gets the verdict 'unclear'.
+    """
+    annotated = []
+    for index, (entry, analysis) in enumerate(zip(log, analyses)):
+        # A position whose analysis failed carries only {'id', 'error'}
+        top_moves = analysis.get('top_moves', [])
+        best_win_rate = None
+        if top_moves and top_moves[0]['visits'] >= MIN_REVIEW_VISITS:
+            best_win_rate = top_moves[0]['win_rate']
+        played = next((m for m in top_moves if m['move'] == entry['move']), None)
+        next_top_moves = analyses[index + 1].get('top_moves') if index + 1 < len(analyses) else None
+        if played is not None and played['visits'] >= MIN_REVIEW_VISITS:
+            played_win_rate = played['win_rate']
+        elif next_top_moves and next_top_moves[0]['visits'] >= MIN_REVIEW_VISITS:
+            # Barely searched at this root: judge it by the opponent's best reply afterwards
+            played_win_rate = 100.0 - next_top_moves[0]['win_rate']
+        else:
+            played_win_rate = None
+
+        drop = None
+        verdict = 'unclear'
+        if best_win_rate is not None and played_win_rate is not None:
+            drop = round(max(0.0, best_win_rate - played_win_rate), 2)
+            if drop >= blunder_drop:
+                verdict = 'blunder'
+            elif drop >= mistake_drop:
+                verdict = 'mistake'
+            else:
+                verdict = 'ok'
+
+        review = {
+            'best_move': analysis.get('best_move'),
+            'best_win_rate': best_win_rate,
+            'played_win_rate': played_win_rate,
+            'win_rate_drop': drop,
+            'verdict': verdict,
+            'simulations': analysis.get('simulations', 0),
+            'top_moves': top_moves[:TOP_MOVES_KEPT],
+        }
+        annotated.append(dict(entry, review=review))
+    return annotated
+
+
+def review_games(paths, out_path, size=BOARD_SIZE, time_limit_ms=3000, min_simulations=2000, processes=None,
+                 blunder_drop=20.0, mistake_drop=10.0):
+    """
+    Re-analyses every position of every game in parallel and writes one
+    annotated game per line to out_path as soon as its last position is done.
+    Games are read lazily, so only the games with positions in flight are held
+    in memory. Returns (games reviewed, blunders found).
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = processes or os.cpu_count()
+    tagged_jobs = _review_jobs(iter_game_logs(paths), size, time_limit_ms, min_simulations)
+    tags, jobs = itertools.tee(tagged_jobs)
+    tags = (tag for tag, _ in tags)
+    jobs = (job for _, job in jobs)
+
+    games_done = blunders = 0
+    analyses = []
+    with ProcessPoolExecutor(processes) as executor, open(out_path, 'w') as out:
+        results = bounded_map(executor, analyse_position, jobs, 2 * processes)
+        for (game_no, source, log), analysis in zip(tags, results):
+            analyses.append(analysis)
+            if len(analyses) < len(log):
+                continue
+            annotated = annotate_game(log, analyses, blunder_drop, mistake_drop)
+            blunders += sum(1 for entry in annotated if entry['review']['verdict'] == 'blunder')
+            out.write(json.dumps({'source': source, 'log': annotated}) + '\n')
+            out.flush()
+            games_done += 1
+            analyses = []
+    return games_done, blunders
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-analyse finished games and flag blunders.")
+    parser.add_argument('logs', nargs='+', help="game logs (.json), JSON-lines archives (.jsonl) or game archives (.dat)")
+    parser.add_argument('--out', default='reviewed_games.jsonl')
+    parser.add_argument('--size', type=int, default=BOARD_SIZE, help="board size of logs that do not record it")
+    parser.add_argument('--time-ms', type=int, default=3000, help="search time per position")
+    parser.add_argument('--sims', type=int, default=2000, help="minimum simulations per position")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--blunder', type=float, default=20.0, help="win-rate drop (percent) flagged as blunder")
+    parser.add_argument('--mistake', type=float, default=10.0, help="win-rate drop (percent) flagged as mistake")
+    cli_args = parser.parse_args()
+
+    reviewed, found = review_games(cli_args.logs, cli_args.out, cli_args.size, cli_args.time_ms, cli_args.sims,
+                                   cli_args.processes, cli_args.blunder, cli_args.mistake)
+    print(f"Reviewed {reviewed} games, {found} blunders flagged, written to {cli_args.out}")
@@ -0,0 +1,559 @@
+# gomoku/mcts.py
+import json
+import math
+import random
+import sys
+import time
+from .game import AI_PLAYER, HUMAN_PLAYER
+from .time_control import TimeControl
+
+# Tuned pattern weights (see gomoku.tuning), picked up at startup when present
+WEIGHTS_FILE = 'pattern_weights.json'
+
+
+def load_pattern_weights(path):
+    """Numeric weights from a JSON weights file, or {} when it is missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            weights = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(weights, dict):
+        return {}
+    return {key: value for key, value in weights.items() if isinstance(value, (int, float))}
+
+
+_NODE_BYTES_CACHE = {}
+
+
+def estimate_node_bytes(node):
+    """
+    Approximate bytes held by one node including its own GomokuGame, measured
+    with sys.getsizeof once per board size on a node with a full move list.
+    """
+    state = node.game_state
+    if state.size not in _NODE_BYTES_CACHE:
+        parts = [node, node.__dict__, node.children, node.untried_moves,
+                 state, state.__dict__, state.board, state.move_history,
+                 state.frontier, state.frontier.cells, state.frontier.index, state.win_cells]
+        parts.extend(state.win_cells.values())
+        _NODE_BYTES_CACHE[state.size] = sum(sys.getsizeof(part) for part in parts)
+    return _NODE_BYTES_CACHE[state.size]
+
+
+def count_nodes(root_node):
+    count, stack = 0, [root_node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+class MCTSNode:
+    def __init__(self, game_state, parent=None, move=None):
+        self.game_state = game_state
+        self.parent = parent
+        self.move = move
+        self.children = []
+        self.wins = 0
+        self.visits = 0
+        self.untried_moves = game_state.get_legal_moves()
+
+    def ucb1(self, exploration_constant=1.41):
+        if self.visits == 0:
+            return float('inf')
+        return (self.wins / self.visits) + exploration_constant * math.sqrt(math.log(self.parent.visits) / self.visits)
+
+    def add_child(self, move, new_state):
+        child = MCTSNode(game_state=new_state, parent=self, move=move)
+        self.children.append(child)
+        self.untried_moves.remove(move)
+        return child
+
+
+class MCTS_AI:
+    def __init__(self, heuristic_method='pattern', opening_book=None, search_cache=None, time_control=None,
+                 weights_file=WEIGHTS_FILE, seed=None):
+        # 'pattern' scores every expansion candidate with the pattern heuristics
+        # below; 'random' expands uniformly among moves next to existing stones
+        # and only looks for immediate wins and blocks, which is far cheaper
+        # (see gomoku.profiles for the levels built on each).
+        self.heuristic_method = heuristic_method
+        # With a seed every search starts from a fresh random.Random(seed), so
+        # the same position (and the same reused tree / cache contents) under a
+        # FixedIterations time control gives the same tree and move every time.
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.time_control = time_control if time_control is not None else TimeControl()
+        self.opening_book = opening_book
+        self.search_cache = search_cache
+        # Total visits the cached statistics of a position are scaled down to
+        # when used as root priors, so fresh simulations can still overturn them.
+        self.cache_prior_visits = 50
+        # With reuse_tree on, the next search continues from the subtree of the
+        # previous root that matches the new position (our move + their reply).
+        self.reuse_tree = False
+        self._last_root = None
+        # Tree size budget. Over budget, prune_policy 'prune' collapses the
+        # lowest-visit subtrees into their (already aggregated) top node until
+        # the tree is back to prune_target of the budget; 'freeze' just stops
+        # expanding. None means unbounded.
+        self.max_nodes = None
+        self.max_tree_bytes = None
+        # Hard cap on simulations per search, whatever time is left
+        self.max_simulations = None
+        self.prune_policy = 'prune'
+        self.prune_target = 0.75
+        self.last_search_stats = {}
+        self.pattern_scores = {
+            'win': 1000000,
+            'block_win': 500000,
+            'open_four': 10000,
+            'block_open_four': 20000,
+            'open_three': 5000,
+            'block_open_three': 50000,
+            'dev_own': 2,
+            'dev_opp': 1,
+        }
+        if weights_file is not None:
+            for key, value in load_pattern_weights(weights_file).items():
+                if key in self.pattern_scores:
+                    self.pattern_scores[key] = value
+        self.visualization_callback = None
+        self.visualization_enabled = False
+
+    # --- YOUR POWERFUL HEURISTIC FUNCTIONS ---
+    def _score_move(self, game_state, move, player):
+        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+        size = game_state.size
+        score = 0
+
+        if move in game_state.win_cells[player]:
+            return self.pattern_scores['win']
+
+        if move in game_state.win_cells[opponent]:
+            score += self.pattern_scores['block_win']
+
+        threat_moves = self._scan_for_existing_threats(game_state.board, opponent, size)
+        if move in threat_moves:
+            score += self.pattern_scores['block_open_three'] * 10
+
+        if self._detect_open_three_threat(game_state.board, move, opponent, size):
+            score += self.pattern_scores['block_open_three'] * 5
+
+        if self._detect_open_three_threat(game_state.board, move, player, size):
+            score += self.pattern_scores['open_three']
+
+        board_after_move = list(game_state.board)
+        board_after_move[move] = player
+        score += self._count_patterns_on_board(
+            board_after_move, move, player, size, f" {player * 4} ", self.pattern_scores['open_four']
+        )
+
+        r, c = divmod(move, size)
+        for ro in (-1, 0, 1):
+            for co in (-1, 0, 1):
+                if ro == 0 and co == 0:
+                    continue
+                nr, nc = r + ro, c + co
+                if 0 <= nr < size and 0 <= nc < size:
+                    neighbor = game_state.board[nr * size + nc]
+                    if neighbor == player:
+                        score += self.pattern_scores['dev_own']
+                    elif neighbor == opponent:
+                        score += self.pattern_scores['dev_opp']
+        return score
+
+    def _count_patterns_on_board(self, board, move, player, size, pattern, score_value):
+        r, c = divmod(move, size)
+        total_score = 0
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        for dr, dc in directions:
+            line = ""
+            for i in range(-4, 5):
+                nr, nc = r + i * dr, c + i * dc
+                if 0 <= nr < size and 0 <= nc < size:
+                    line += board[nr * size + nc]
+                else:
+                    line += "#"
+            if pattern in line:
+                total_score += score_value
+        return total_score
+
+    def _get_scored_moves(self, game_state):
+        if self.heuristic_method == 'random':
+            return self._get_tactical_moves(game_state)
+        moves_with_scores = []
+        for move in game_state.get_legal_moves():
+            score = self._score_move(game_state, move, game_state.current_player)
+            moves_with_scores.append((score, move))
+        return sorted(moves_with_scores, key=lambda x: x[0], reverse=True)
+
+    def _get_tactical_moves(self, game_state):
+        """Immediate wins, then blocks of the opponent's immediate wins, read from the win cells."""
+        player = game_state.current_player
+        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+        own_wins = game_state.win_cells[player]
+        moves = [(self.pattern_scores['win'], m) for m in sorted(own_wins)]
+        moves.extend((self.pattern_scores['block_win'], m) for m in sorted(game_state.win_cells[opponent] - own_wins))
+        return moves
+
+    def _scan_for_existing_threats(self, board, player, size):
+        threat_moves = set()
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        for pos in range(size * size):
+            if board[pos] != player:
+                continue
+            r, c = divmod(pos, size)
+            for dr, dc in directions:
+                line_positions, line_chars = [], []
+                for i in range(-2, 4):
+                    nr, nc = r + i * dr, c + i * dc
+                    if 0 <= nr < size and 0 <= nc < size:
+                        line_positions.append(nr * size + nc)
+                        cell = board[nr * size + nc]
+                        line_chars.append('X' if cell == player else '_' if cell == ' ' else 'O')
+                    else:
+                        line_positions.append(None)
+                        line_chars.append('#')
+                line_str = ''.join(line_chars)
+                if '_XXX_' in line_str:
+                    idx = line_str.find('_XXX_')
+                    threat_moves.add(line_positions[idx])
+                    threat_moves.add(line_positions[idx + 4])
+                if '_XX_X_' in line_str:
+                    threat_moves.add(line_positions[line_str.find('_XX_X_') + 3])
+                if '_X_XX_' in line_str:
+                    threat_moves.add(line_positions[line_str.find('_X_XX_') + 2])
+                if 'XXXX' in line_str:
+                    idx = line_str.find('XXXX')
+                    if idx > 0 and line_chars[idx - 1] == '_':
+                        threat_moves.add(line_positions[idx - 1])
+                    if idx + 4 < len(line_positions) and line_chars[idx + 4] == '_':
+                        threat_moves.add(line_positions[idx + 4])
+        return list(filter(None, threat_moves))
+
+    def _detect_open_three_threat(self, board, move, player, size):
+        r, c = divmod(move, size)
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        temp_board = list(board)
+        temp_board[move] = player
+        for dr, dc in directions:
+            consecutive, open_ends = 1, 0
+            for i in range(1, 5):
+                nr, nc = r + i * dr, c + i * dc
+                if 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == player:
+                    consecutive += 1
+                elif 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == ' ':
+                    open_ends += 1
+                    break
+                else:
+                    break
+            for i in range(1, 5):
+                nr, nc = r - i * dr, c - i * dc
+                if 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == player:
+                    consecutive += 1
+                elif 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == ' ':
+                    open_ends += 1
+                    break
+                else:
+                    break
+            if consecutive == 3 and open_ends == 2:
+                return True
+        return False
+
+    def _get_fast_playout_move(self, game_state):
+        """
+        ULTRA-FAST, clone-free heuristic for simulations.
+        Reads the game state's incrementally maintained win cells and
+        frontier, so a step costs O(1) amortised instead of O(board).
+        """
+        if game_state.empty_count == 0:
+            return None
+        player = game_state.current_player
+        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+
+        # Immediate win first, then block the opponent's immediate win
+        own_wins = game_state.win_cells[player]
+        if own_wins:
+            return min(own_wins)
+        opp_wins = game_state.win_cells[opponent]
+        if opp_wins:
+            return min(opp_wins)
+
+        # Fallback to local moves
+        if game_state.frontier:
+            return game_state.frontier.choice(self.rng)
+        return self.rng.choice(game_state.get_legal_moves())
+
+    def _viz_event(self, event_type, data):
+        """Send visualization event if enabled."""
+        if self.visualization_enabled and self.visualization_callback:
+            self.visualization_callback(event_type, data)
+            # Small delay to allow GUI to process events in real-time
+            # Only delay for iteration-level events to give GUI time to render
+            if event_type in ['selection', 'expansion', 'simulation', 'backpropagation']:
+                time.sleep(0.02)  # 20ms delay allows ~50 updates/sec
+
+    def _warm_start_root(self, root_node, root_state):
+        """Seeds root children with scaled statistics from earlier searches of this position."""
+        cached_moves = self.search_cache.lookup(root_state)
+        total_visits = sum(visits for _, visits, _ in cached_moves)
+        if not total_visits:
+            return
+        scale = min(1.0, self.cache_prior_visits / total_visits)
+        for move, visits, wins in cached_moves:
+            if move not in root_node.untried_moves or visits == 0:
+                continue
+            child_state = root_state.clone()
+            child_state.make_move(move, child_state.current_player)
+            child_state.current_player = HUMAN_PLAYER if child_state.current_player == AI_PLAYER else AI_PLAYER
+            child = root_node.add_child(move, child_state)
+            child.visits = max(1, round(visits * scale))
+            child.wins = wins * child.visits / visits
+            root_node.visits += child.visits
+
+    def _find_reusable_root(self, root_state, max_depth=2):
+        """Descendant of the previous search root whose position equals root_state, or None."""
+        frontier = [self._last_root] if self._last_root is not None else []
+        for _ in range(max_depth + 1):
+            next_frontier = []
+            for node in frontier:
+                state = node.game_state
+                if state.current_player == root_state.current_player and state.board == root_state.board:
+                    if not node.children and not node.untried_moves:
+                        return None  # Collapsed by pruning, nothing left to continue from
+                    node.parent = None
+                    return node
+                next_frontier.extend(node.children)
+            frontier = next_frontier
+        return None
+
+    def _node_budget(self, root_node):
+        budgets = []
+        if self.max_nodes is not None:
+            budgets.append(self.max_nodes)
+        if self.max_tree_bytes is not None:
+            budgets.append(self.max_tree_bytes // estimate_node_bytes(root_node))
+        return min(budgets) if budgets else None
+
+    def _prune_tree(self, root_node, target_nodes, node_count):
+        """
+        Collapses the lowest-visit internal subtrees (never the root) into
+        leaves until at most target_nodes remain. A collapsed node keeps its
+        visits and wins, which already include everything below it, and is
+        marked fully expanded so it is only evaluated by rollouts from now on.
+        Returns the number of nodes removed.
+        """
+        internal, stack = [], list(root_node.children)
+        while stack:
+            node = stack.pop()
+            if node.children:
+                internal.append(node)
+                stack.extend(node.children)
+        internal.sort(key=lambda n: n.visits)
+
+        removed, removed_ids = 0, set()
+        for node in internal:
+            if node_count - removed <= target_nodes:
+                break
+            if id(node) in removed_ids:
+                continue
+            stack = list(node.children)
+            while stack:
+                descendant = stack.pop()
+                removed_ids.add(id(descendant))
+                removed += 1
+                stack.extend(descendant.children)
+            node.children = []
+            node.untried_moves = []
+        return removed
+
+    def _choose_expansion_move(self, node, state):
+        if self.heuristic_method == 'random':
+            local_moves = [m for m in node.untried_moves if m in state.frontier]
+            self._viz_event('expansion', {
+                'candidates': [(0, m) for m in local_moves[:10]],
+                'node_move': node.move
+            })
+            return self.rng.choice(local_moves or node.untried_moves)
+
+        scored_untried_moves = []
+        for candidate in node.untried_moves:
+            s = self._score_move(state, candidate, state.current_player)
+            scored_untried_moves.append((s, candidate))
+
+        self._viz_event('expansion', {
+            'candidates': scored_untried_moves[:10],
+            'node_move': node.move
+        })
+
+        if scored_untried_moves:
+            scored_untried_moves.sort(key=lambda x: x[0], reverse=True)
+            top_moves = [m for _, m in scored_untried_moves[:5]]
+            return self.rng.choice(top_moves)
+        return self.rng.choice(node.untried_moves)
+
+    def find_best_move(self, root_state, time_limit_ms, min_simulations, stop_event=None, seed=None):
+        """
+        Returns (move, root_node). Once stop_event (a threading.Event) is set
+        the search ends after the current iteration and returns the best
+        move found so far. seed overrides the engine seed for this search.
+        On a full board there is nothing to search and the move is None.
+        """
+        if seed is None:
+            seed = self.seed
+        if seed is not None:
+            self.rng = random.Random(seed)
+        if root_state.empty_count == 0:
+            return None, MCTSNode(game_state=root_state)
+        if not any(s != ' ' for s in root_state.board):
+            center = (root_state.size // 2) * root_state.size + (root_state.size // 2)
+            dummy_node = MCTSNode(game_state=root_state)
+            dummy_node.visits = 1
+            return center, dummy_node
+
+        if self.opening_book is not None:
+            book_entry = self.opening_book.best_move(root_state)
+            if book_entry is not None:
+                book_move, book_visits, book_wins = book_entry
+                self._viz_event('book_move', {'move': book_move, 'visits': book_visits, 'wins': book_wins})
+                dummy_node = MCTSNode(game_state=root_state)
+                dummy_node.visits = book_visits
+                child_node = dummy_node.add_child(book_move, root_state)
+                child_node.wins = book_wins
+                child_node.visits = book_visits
+                return book_move, dummy_node
+
+        initial_scored_moves = self._get_scored_moves(root_state)
+        if initial_scored_moves:
+            best_initial_score, best_initial_move = initial_scored_moves[0]
+            if best_initial_score >= self.pattern_scores['block_win']:
+                self._viz_event('immediate_move', {
+                    'move': best_initial_move,
+                    'score': best_initial_score,
+                    'reason': 'win' if best_initial_score == self.pattern_scores['win'] else 'block_win'
+                })
+                dummy_node = MCTSNode(game_state=root_state)
+                dummy_node.visits = 1
+                child_node = dummy_node.add_child(best_initial_move, root_state)
+                child_node.wins = 1
+                child_node.visits = 1
+                return best_initial_move, dummy_node
+
+        root_node = self._find_reusable_root(root_state) if self.reuse_tree else None
+        if root_node is None:
+            root_node = MCTSNode(game_state=root_state)
+            if self.search_cache is not None:
+                self._warm_start_root(root_node, root_state)
+        timer = self.time_control.start(time_limit_ms, min_simulations)
+        simulations_run = 0
+        node_budget = self._node_budget(root_node)
+        node_count = count_nodes(root_node)
+        pruned_nodes = 0
+        expansion_frozen = False
+
+        self._viz_event('search_start', {'time_limit_ms': time_limit_ms, 'min_simulations': min_simulations})
+
+        while not timer.should_stop(root_node, simulations_run):
+            if stop_event is not None and stop_event.is_set():
+                timer.stop_reason = 'stopped'
+                break
+            if self.max_simulations is not None and simulations_run >= self.max_simulations:
+                timer.stop_reason = 'max_simulations'
+                break
+            simulations_run += 1
+            self._viz_event('iteration_start', {'iteration': simulations_run})
+
+            # --- SELECTION PHASE ---
+            node = root_node
+            state = root_state.clone()
+            selection_path = []
+            # Once expansion is frozen, nodes with untried moves are descended through too
+            while (expansion_frozen or not node.untried_moves) and node.children:
+                node = max(node.children, key=lambda n: n.ucb1())
+                selection_path.append(node.move)
+                state.make_move(node.move, state.current_player)
+                state.current_player = HUMAN_PLAYER if state.current_player == AI_PLAYER else AI_PLAYER
+
+            if selection_path:
+                self._viz_event('selection', {'path': selection_path, 'ucb_scores': [(c.move, c.ucb1()) for c in node.parent.children if c.parent]})
+
+            # --- EXPANSION PHASE ---
+            if node.untried_moves and not expansion_frozen:
+                move = self._choose_expansion_move(node, state)
+                state.make_move(move, state.current_player)
+                state.current_player = HUMAN_PLAYER if state.current_player == AI_PLAYER else AI_PLAYER
+                node = node.add_child(move, state)
+                node_count += 1
+                if node_budget is not None and node_count > node_budget:
+                    if self.prune_policy == 'prune':
+                        removed = self._prune_tree(root_node, int(node_budget * self.prune_target), node_count)
+                        node_count -= removed
+                        pruned_nodes += removed
+                    # Nothing left to prune (or pruning disabled): keep searching without growing
+                    expansion_frozen = node_count > node_budget
+
+            # --- SIMULATION PHASE ---
+            current_rollout_state = state.clone()
+            simulation_moves = []
+            while current_rollout_state.check_winner(fast_check=True) is None:
+                move = self._get_fast_playout_move(current_rollout_state)
+                if move is None:
+                    break
+                simulation_moves.append(move)
+                current_rollout_state.make_move(move, current_rollout_state.current_player)
+                current_rollout_state.current_player = HUMAN_PLAYER if current_rollout_state.current_player == AI_PLAYER else AI_PLAYER
+            winner = current_rollout_state.check_winner(fast_check=True)
+
+            self._viz_event('simulation', {
+                'moves': simulation_moves[:5],  # Only show first 5 moves
+                'winner': winner,
+                'length': len(simulation_moves)
+            })
+
+            # --- BACKPROPAGATION PHASE ---
+            backprop_path = []
+            temp_node = node
+            while temp_node is not None:
+                backprop_path.append(temp_node.move)
+                temp_node = temp_node.parent
+
+            self._viz_event('backpropagation', {
+                'path': [m for m in backprop_path if m is not None],
+                'winner': winner
+            })
+
+            while node is not None:
+                node.visits += 1
+                if node.parent:
+                    player_who_moved = node.parent.game_state.current_player
+                    if winner == player_who_moved:
+                        node.wins += 1
+                    elif winner == 'draw':
+                        node.wins += 0.5
+                node = node.parent
+
+        self.last_search_stats = {
+            'simulations': simulations_run,
+            'tree_nodes': node_count,
+            'tree_bytes': node_count * estimate_node_bytes(root_node),
+            'pruned_nodes': pruned_nodes,
+            'stop_reason': timer.stop_reason,
+        }
+        self._viz_event('search_complete', dict(self.last_search_stats, **{
+            'total_iterations': simulations_run,
+            'time_elapsed': timer.elapsed() * 1000
+        }))
+
+        # A search cut short by stop_event is too shallow to be worth remembering
+        if self.search_cache is not None and timer.stop_reason != 'stopped':
+            self.search_cache.store(root_state, root_node)
+        if self.reuse_tree:
+            self._last_root = root_node
+
+        if not root_node.children:
+            return self.rng.choice(root_state.get_legal_moves()), root_node
+        best_child = max(root_node.children, key=lambda n: n.visits)
+        return best_child.move, root_node
\ No newline at end of file
@@ -0,0 +1,209 @@
+# gomoku/opening_book.py
+import hashlib
+import mmap
+import struct
+
+from .game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+
+# --- On-disk format ---
+# Header: magic, board size, win length, record count.
+# Records: (canonical position key, move in canonical frame, visits, wins),
+# sorted by key and then by descending visits, so a probe is a binary search
+# straight over the memory-mapped file.
+BOOK_MAGIC = b'GMKBOOK1'
+HEADER = struct.Struct('<8sHHI')
+RECORD = struct.Struct('<QHIf')
+
+_SYMMETRY_CACHE = {}
+
+
+def _symmetries_for(size):
+    """The 8 board symmetries as (forward, inverse) position permutations."""
+    if size not in _SYMMETRY_CACHE:
+        n = size - 1
+        transforms = [
+            lambda r, c: (r, c),
+            lambda r, c: (c, n - r),
+            lambda r, c: (n - r, n - c),
+            lambda r, c: (n - c, r),
+            lambda r, c: (r, n - c),
+            lambda r, c: (c, r),
+            lambda r, c: (n - r, c),
+            lambda r, c: (n - c, n - r),
+        ]
+        tables = []
+        for transform in transforms:
+            forward = [0] * (size * size)
+            inverse = [0] * (size * size)
+            for pos in range(size * size):
+                r, c = transform(*divmod(pos, size))
+                forward[pos] = r * size + c
+                inverse[r * size + c] = pos
+            tables.append((forward, inverse))
+        _SYMMETRY_CACHE[size] = tables
+    return _SYMMETRY_CACHE[size]
+
+
+def canonical_key(game_state):
+    """
+    Returns (key, symmetry) for the position: a 64-bit hash of the smallest of
+    the 8 symmetric boards (plus side to move), and the index of the symmetry
+    that maps this board onto it.
+    """
+    board = game_state.board
+    best_board, best_index = None, 0
+    for index, (forward, _) in enumerate(_symmetries_for(game_state.size)):
+        transformed = [' '] * len(board)
+        for pos, spot in enumerate(board):
+            if spot != ' ':
+                transformed[forward[pos]] = spot
+        transformed = ''.join(transformed)
+        if best_board is None or transformed < best_board:
+            best_board, best_index = transformed, index
+    digest = hashlib.blake2b(
+        f"{game_state.size}:{game_state.win_len}:{game_state.current_player}:{best_board}".encode(),
+        digest_size=8,
+    ).digest()
+    return int.from_bytes(digest, 'little'), best_index
+
+
+def to_canonical_move(move, size, symmetry):
+    return _symmetries_for(size)[symmetry][0][move]
+
+
+def from_canonical_move(move, size, symmetry):
+    return _symmetries_for(size)[symmetry][1][move]
+
+
+class OpeningBook:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.win_len, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != BOOK_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book file")
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _key_at(self, index):
+        return RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)[0]
+
+    def probe(self, game_state):
+        """All book moves for the position as (move, visits, wins), best first."""
+        if game_state.size != self.size or game_state.win_len != self.win_len:
+            return []
+        key, symmetry = canonical_key(game_state)
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        entries = []
+        while lo < self.count:
+            record_key, move, visits, wins = RECORD.unpack_from(self._map, HEADER.size + lo * RECORD.size)
+            if record_key != key:
+                break
+            entries.append((from_canonical_move(move, self.size, symmetry), visits, wins))
+            lo += 1
+        return entries
+
+    def best_move(self, game_state):
+        """The most visited legal book move, or None when the position is not in the book."""
+        for move, visits, wins in self.probe(game_state):
+            if game_state.board[move] == ' ':
+                return move, visits, wins
+        return None
+
+    @staticmethod
+    def write(path, size, win_len, entries):
+        """Writes {key: [(canonical_move, visits, wins), ...]} as a book file."""
+        records = []
+        for key, moves in entries.items():
+            for move, visits, wins in moves:
+                records.append((key, move, visits, wins))
+        records.sort(key=lambda rec: (rec[0], -rec[2]))
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(BOOK_MAGIC, size, win_len, len(records)))
+            for record in records:
+                f.write(RECORD.pack(*record))
+
+
+# --- Offline builder ---
+def _analyse_position(args):
+    """Pool worker: deep search of one position, returns its most visited root moves."""
+    from .mcts import MCTS_AI
+
+    board, current_player, size, win_len, time_limit_ms, min_simulations, breadth = args
+    game = GomokuGame(board=board, current_player=current_player, size=size, win_len=win_len)
+    move, root_node = MCTS_AI().find_best_move(game, time_limit_ms, min_simulations)
+    if not root_node.children:
+        return [(move, max(root_node.visits, 1), float(max(root_node.visits, 1)))]
+    children = sorted(root_node.children, key=lambda n: n.visits, reverse=True)[:breadth]
+    return [(child.move, child.visits, float(child.wins)) for child in children]
+
+
+def build_book(path, size=9, win_len=5, depth=4, breadth=3, time_limit_ms=5000, min_simulations=2000,
+               processes=None):
+    """
+    Breadth-first expansion from the empty board: every position is searched
+    once per symmetry class, and its `breadth` most visited replies seed the
+    next ply until `depth` plies are covered.
+    """
+    from multiprocessing import Pool
+
+    entries = {}
+    level = [GomokuGame(size=size, win_len=win_len, current_player=p) for p in (AI_PLAYER, HUMAN_PLAYER)]
+    with Pool(processes) as pool:
+        for ply in range(depth):
+            unique = {}
+            for game in level:
+                key, symmetry = canonical_key(game)
+                if key not in entries and key not in unique:
+                    unique[key] = (game, symmetry)
+            if not unique:
+                break
+            keys = list(unique)
+            jobs = [(unique[k][0].board, unique[k][0].current_player, size, win_len,
+                     time_limit_ms, min_simulations, breadth) for k in keys]
+            next_level = []
+            for key, moves in zip(keys, pool.imap(_analyse_position, jobs)):
+                game, symmetry = unique[key]
+                entries[key] = [(to_canonical_move(m, size, symmetry), v, w) for m, v, w in moves]
+                for move, _, _ in moves:
+                    child = game.clone()
+                    child.make_move(move, child.current_player)
+                    if child.check_winner(fast_check=True) is not None:
+                        continue
+                    child.current_player = HUMAN_PLAYER if child.current_player == AI_PLAYER else AI_PLAYER
+                    next_level.append(child)
+            print(f"ply {ply}: {len(keys)} positions searched, {len(entries)} in book")
+            level = next_level
+
+    OpeningBook.write(path, size, win_len, entries)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a Gomoku opening book with parallel deep searches.")
+    parser.add_argument('--out', default='opening_book.bin')
+    parser.add_argument('--size', type=int, default=9)
+    parser.add_argument('--win-len', type=int, default=5)
+    parser.add_argument('--depth', type=int, default=4, help="plies from the empty board")
+    parser.add_argument('--breadth', type=int, default=3, help="replies kept per position")
+    parser.add_argument('--time-ms', type=int, default=5000)
+    parser.add_argument('--sims', type=int, default=2000)
+    parser.add_argument('--processes', type=int, default=None)
+    cli_args = parser.parse_args()
+    count = build_book(cli_args.out, cli_args.size, cli_args.win_len, cli_args.depth, cli_args.breadth,
+                       cli_args.time_ms, cli_args.sims, cli_args.processes)
+    print(f"Wrote {count} positions to {cli_args.out}")
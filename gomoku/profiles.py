@@ -0,0 +1,77 @@
+# gomoku/profiles.py
+from .mcts import MCTS_AI
+
+
+# Per-move search time of the reference full-strength game that cpu_cost is measured in
+REFERENCE_MOVE_MS = 1000
+
+
+class EngineProfile:
+    """
+    One difficulty level: the move policy the engine searches with and how
+    much search it may spend. budget() clamps the requested time and
+    simulations; time_scale lets strong levels think longer than asked, and
+    max_simulations ends a search early however much time is left.
+    simulation_ms is a rough CPU cost of one simulation on a 15x15 board,
+    used by cpu_cost() to estimate the load of a game at this level.
+    """
+
+    def __init__(self, name, label, heuristic_method, simulation_ms, time_scale=1.0, max_time_ms=None,
+                 max_simulations=None, max_nodes=None, reuse_tree=False):
+        self.name = name
+        self.label = label
+        self.heuristic_method = heuristic_method
+        self.simulation_ms = simulation_ms
+        self.time_scale = time_scale
+        self.max_time_ms = max_time_ms
+        self.max_simulations = max_simulations
+        self.max_nodes = max_nodes
+        self.reuse_tree = reuse_tree
+
+    def create_engine(self, **engine_args):
+        ai = MCTS_AI(heuristic_method=self.heuristic_method, **engine_args)
+        ai.max_nodes = self.max_nodes
+        ai.max_simulations = self.max_simulations
+        ai.reuse_tree = self.reuse_tree
+        return ai
+
+    def budget(self, time_limit_ms, min_simulations):
+        """(time_limit_ms, min_simulations) this level actually searches with."""
+        time_limit_ms = int(time_limit_ms * self.time_scale)
+        if self.max_time_ms is not None:
+            time_limit_ms = min(time_limit_ms, self.max_time_ms)
+        if self.max_simulations is not None:
+            min_simulations = min(min_simulations, self.max_simulations)
+        return time_limit_ms, min_simulations
+
+    def cpu_cost(self, time_limit_ms, min_simulations):
+        """
+        Expected CPU per move of a game asking for this budget, in units of a
+        REFERENCE_MOVE_MS search. A search runs until its time limit unless
+        max_simulations ends it first or min_simulations keeps it going.
+        """
+        time_limit_ms, min_simulations = self.budget(time_limit_ms, min_simulations)
+        spend_ms = time_limit_ms
+        if self.max_simulations is not None:
+            spend_ms = min(spend_ms, self.max_simulations * self.simulation_ms)
+        spend_ms = max(spend_ms, min_simulations * self.simulation_ms)
+        return spend_ms / REFERENCE_MOVE_MS
+
+
+# Weakest first. The names are what settings and the game archive store.
+PROFILES = {
+    # Uniform moves next to existing stones, immediate wins/blocks only, at most 200 simulations
+    'random': EngineProfile('random', "Goldfish", 'random', simulation_ms=2,
+                            max_time_ms=300, max_simulations=200, max_nodes=2000),
+    'pattern': EngineProfile('pattern', "Dim Opponent", 'pattern', simulation_ms=11, reuse_tree=True),
+    # Full pattern scoring with twice the time
+    'deep': EngineProfile('deep', "Sharp Opponent", 'pattern', simulation_ms=11, time_scale=2.0, reuse_tree=True),
+}
+DEFAULT_PROFILE = 'pattern'
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"unknown level {name!r}, expected one of {', '.join(PROFILES)}") from None
@@ -0,0 +1,101 @@
+# gomoku/search_cache.py
+import sqlite3
+import struct
+import threading
+import time
+
+from .opening_book import canonical_key, to_canonical_move, from_canonical_move
+
+# Per-move statistics packed into one BLOB per position: (canonical move, visits, wins)
+MOVE_STATS = struct.Struct('<HIf')
+MAX_MOVES_PER_POSITION = 16
+
+
+def _to_signed(key):
+    """SQLite integers are signed 64-bit."""
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+class SearchCache:
+    """
+    Persistent position -> root statistics store shared across games.
+    Searches write their root children after finishing, later searches of the
+    same position (up to symmetry) read them back as warm-start priors.
+    Rows are evicted least-recently-used first once max_entries is exceeded,
+    and unconditionally once they have not been used for max_age_days.
+    """
+
+    def __init__(self, path, max_entries=100000, max_age_days=90):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_secs = max_age_days * 86400
+        self._lock = threading.Lock()
+        # Searches run on a worker thread, so the connection is shared behind a lock.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS positions ("
+                "key INTEGER PRIMARY KEY, visits INTEGER, wins REAL, best_move INTEGER, "
+                "moves BLOB, last_used REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS positions_last_used ON positions (last_used)")
+        self._evict()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def lookup(self, game_state):
+        """Cached root moves for the position as (move, visits, wins), most visited first."""
+        key, symmetry = canonical_key(game_state)
+        key = _to_signed(key)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT moves FROM positions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return []
+            self._conn.execute("UPDATE positions SET last_used = ? WHERE key = ?", (time.time(), key))
+        return [
+            (from_canonical_move(move, game_state.size, symmetry), visits, wins)
+            for move, visits, wins in MOVE_STATS.iter_unpack(row[0])
+        ]
+
+    def store(self, game_state, root_node):
+        """
+        Replaces the cached statistics of the position with the root of a
+        finished search, unless the cached row comes from a deeper search
+        (more root visits), which is kept.
+        """
+        if not root_node.children:
+            return
+        key, symmetry = canonical_key(game_state)
+        children = sorted(root_node.children, key=lambda n: n.visits, reverse=True)[:MAX_MOVES_PER_POSITION]
+        moves = b''.join(
+            MOVE_STATS.pack(to_canonical_move(child.move, game_state.size, symmetry), child.visits, child.wins)
+            for child in children
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO positions (key, visits, wins, best_move, moves, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET visits = excluded.visits, wins = excluded.wins, "
+                "best_move = excluded.best_move, moves = excluded.moves, last_used = excluded.last_used "
+                "WHERE excluded.visits >= positions.visits",
+                (_to_signed(key), root_node.visits, sum(c.wins for c in root_node.children),
+                 to_canonical_move(children[0].move, game_state.size, symmetry), moves, time.time()),
+            )
+        self._evict()
+
+    def _evict(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM positions WHERE last_used < ?", (time.time() - self.max_age_secs,))
+            count = self._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM positions WHERE key IN "
+                    "(SELECT key FROM positions ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
@@ -0,0 +1,89 @@
+# gomoku/search_worker.py
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+
+class SearchHandle:
+    """
+    A submitted search. stop_now() ends it after the current iteration and
+    still delivers the best move found so far; cancel() ends it and discards
+    the result. Results are available through result(), add_done_callback(),
+    the underlying concurrent.futures.Future, or by awaiting the handle.
+    """
+
+    def __init__(self):
+        self.future = Future()
+        # Polled by find_best_move once per iteration, so it must stay a plain Event
+        self.stop_event = threading.Event()
+
+    def stop_now(self):
+        self.stop_event.set()
+
+    def cancel(self):
+        self.stop_event.set()
+        return self.future.cancel()
+
+    def cancelled(self):
+        return self.future.cancelled()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """(move, root_node) of the finished search."""
+        return self.future.result(timeout)
+
+    def add_done_callback(self, fn):
+        """Calls fn(handle) once the search finishes or is cancelled."""
+        self.future.add_done_callback(lambda _: fn(self))
+
+    def __await__(self):
+        import asyncio
+        return asyncio.wrap_future(self.future).__await__()
+
+
+class SearchWorker:
+    """
+    One long-lived daemon thread that runs submitted searches in order,
+    instead of a fresh thread per move. Cancelled handles still in the queue
+    are skipped without searching.
+    """
+
+    def __init__(self, name='gomoku-search'):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, ai, game_state, time_limit_ms, min_simulations):
+        handle = SearchHandle()
+        self._queue.put((handle, ai, game_state, time_limit_ms, min_simulations))
+        return handle
+
+    def shutdown(self, wait=False):
+        """Stops the worker after the running search; pending searches are cancelled."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        for handle, ai, game_state, time_limit_ms, min_simulations in iter(self._queue.get, None):
+            if handle.cancelled():
+                continue
+            try:
+                result = ai.find_best_move(game_state, time_limit_ms, min_simulations, stop_event=handle.stop_event)
+            except Exception as exc:
+                outcome = (handle.future.set_exception, exc)
+            else:
+                outcome = (handle.future.set_result, result)
+            try:
+                outcome[0](outcome[1])
+            except InvalidStateError:  # Cancelled while the search was running
+                pass
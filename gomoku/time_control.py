@@ -0,0 +1,163 @@
+# gomoku/time_control.py
+import time
+
+
+class TimeControl:
+    """
+    Stopping rules for one MCTS search, layered on top of the classic
+    "time_limit_ms elapsed and min_simulations done" condition. UCB1 visits
+    every root move once before revisiting any and then spreads visits
+    almost evenly, so the rules only look at the root once it is fully
+    expanded and compare win rates with confidence bounds
+    (mean +/- confidence_z * 0.5 / sqrt(visits), the worst-case spread):
+      - 'decided': the most visited child cannot be overtaken by the
+        simulations still left in the budget,
+      - 'separated': the most visited child is also the best by win rate and
+        its lower bound is above every other child's upper bound,
+      - 'stable': the most visited child has led for `stability_checks`
+        consecutive checks with its lower bound above the runner-up's win rate,
+      - extend the deadline when time runs out on a two-horse race: the best
+        two children by win rate overlap each other but the runner-up's
+        lower bound clears every other child's win rate. When many moves are
+        equally good more time would not separate them, so nothing is extended.
+    """
+
+    def __init__(self, early_stop=True, check_interval=32, confidence_z=2.0, stability_checks=8,
+                 extension_fraction=0.5, max_extensions=1):
+        self.early_stop = early_stop
+        self.check_interval = check_interval
+        self.confidence_z = confidence_z
+        self.stability_checks = stability_checks
+        self.extension_fraction = extension_fraction
+        self.max_extensions = max_extensions
+
+    def start(self, time_limit_ms, min_simulations):
+        return SearchTimer(self, time_limit_ms, min_simulations)
+
+
+class SearchTimer:
+    """Per-search state of a TimeControl; call should_stop once per iteration."""
+
+    def __init__(self, control, time_limit_ms, min_simulations):
+        self.control = control
+        self.time_limit_secs = time_limit_ms / 1000.0
+        self.min_simulations = min_simulations
+        self.start_time = time.monotonic()
+        self.deadline = self.time_limit_secs
+        self.extensions_left = control.max_extensions if control.early_stop else 0
+        self.stop_reason = None
+        self._leader = None
+        self._stable_checks = 0
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def _bounds(self, child):
+        """(win rate, lower bound, upper bound) of a root child."""
+        mean = child.wins / child.visits
+        half_width = self.control.confidence_z * 0.5 / child.visits ** 0.5
+        return mean, mean - half_width, mean + half_width
+
+    def should_stop(self, root_node, simulations_run):
+        control = self.control
+        elapsed = self.elapsed()
+        budget_done = elapsed >= self.deadline and simulations_run >= self.min_simulations
+        # Rules only compare children once every root move has a visit
+        ranked = sorted(root_node.children, key=lambda n: n.visits, reverse=True)
+        comparable = not root_node.untried_moves and len(ranked) > 1
+
+        if budget_done and self.extensions_left and comparable and self._two_horse_race(ranked):
+            self.extensions_left -= 1
+            self.deadline = elapsed + self.time_limit_secs * control.extension_fraction
+            return False
+        if budget_done:
+            self.stop_reason = 'budget'
+            return True
+        if not control.early_stop or not comparable or simulations_run % control.check_interval:
+            return False
+
+        leader, others = ranked[0], ranked[1:]
+        rate = simulations_run / max(elapsed, 1e-6)
+        remaining = max(self.min_simulations - simulations_run, (self.deadline - elapsed) * rate)
+        if leader.visits - others[0].visits > remaining:
+            self.stop_reason = 'decided'
+            return True
+
+        mean, lower, _ = self._bounds(leader)
+        other_bounds = [self._bounds(child) for child in others]
+        if lower > max(upper for _, _, upper in other_bounds):
+            self.stop_reason = 'separated'
+            return True
+
+        if leader.move == self._leader:
+            self._stable_checks += 1
+        else:
+            self._leader, self._stable_checks = leader.move, 0
+        if (simulations_run * 4 >= self.min_simulations
+                and lower > max(other_mean for other_mean, _, _ in other_bounds)
+                and self._stable_checks >= control.stability_checks):
+            self.stop_reason = 'stable'
+            return True
+        return False
+
+    def _two_horse_race(self, children):
+        by_rate = sorted((self._bounds(child) for child in children), reverse=True)
+        (_, first_lower, _), (_, second_lower, second_upper) = by_rate[:2]
+        rest_best = by_rate[2][0] if len(by_rate) > 2 else 0.0
+        return second_upper > first_lower and second_lower > rest_best
+
+
+class FixedIterations:
+    """
+    Runs exactly `iterations` simulations and ignores the clock, for
+    reproducible benchmarks: together with a seeded MCTS_AI the same inputs
+    give the same tree regardless of machine speed or load.
+    find_best_move's time_limit_ms and min_simulations are ignored.
+    """
+
+    def __init__(self, iterations):
+        self.iterations = iterations
+
+    def start(self, time_limit_ms, min_simulations):
+        return FixedIterationTimer(self.iterations)
+
+
+class FixedIterationTimer:
+    def __init__(self, iterations):
+        self.iterations = iterations
+        self.start_time = time.monotonic()
+        self.stop_reason = None
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def should_stop(self, root_node, simulations_run):
+        if simulations_run >= self.iterations:
+            self.stop_reason = 'iterations'
+            return True
+        return False
+
+
+class GameClock:
+    """
+    Game-level budget: a total time bank plus a per-move increment. Hands out
+    per-move time limits for find_best_move and books the time actually used.
+    """
+
+    def __init__(self, total_ms, increment_ms=0, moves_to_go=20, min_move_ms=50, safety_ms=50):
+        self.remaining_ms = total_ms
+        self.increment_ms = increment_ms
+        self.moves_to_go = moves_to_go
+        self.min_move_ms = min_move_ms
+        self.safety_ms = safety_ms
+
+    def allocate(self, game_state):
+        """Time limit in ms for the next move of the given position."""
+        # A Gomoku game rarely fills the board; assume at most half the empty cells are ours to play.
+        moves_left = max(1, min(self.moves_to_go, game_state.empty_count // 2))
+        share = self.remaining_ms / moves_left + self.increment_ms
+        ceiling = self.remaining_ms + self.increment_ms - self.safety_ms
+        return int(max(self.min_move_ms, min(share, ceiling)))
+
+    def spend(self, used_ms):
+        self.remaining_ms = max(0, self.remaining_ms - used_ms) + self.increment_ms
@@ -0,0 +1,114 @@
+# gomoku/tuning.py
+import json
+import math
+import random
+
+from .game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from .mcts import MCTS_AI, WEIGHTS_FILE
+
+# 'win' and 'block_win' stay fixed: find_best_move compares scores against
+# them to decide immediate moves, so they anchor the scale of everything else.
+# 'block_open_three' stays fixed too: _score_move gives cells that block an
+# existing open three block_open_three * 10, which at the default weight is
+# exactly block_win, so lowering it would switch off the instant block.
+# Only weights _score_move actually reads are tuned.
+TUNED_KEYS = ('open_four', 'open_three', 'dev_own', 'dev_opp')
+# Upper bounds on the tuned weights. A cell scores at most 4 * open_four +
+# open_three + 8 * max(dev_own, dev_opp) + block_open_three * 5 without a
+# win or an instant block: 160000 + 40000 + 8000 + 250000 < block_win, so no
+# tuned combination can pass for an immediate block in find_best_move.
+WEIGHT_CAPS = {'open_four': 40000, 'open_three': 40000, 'dev_own': 1000, 'dev_opp': 1000}
+
+
+def play_game(args):
+    """
+    Pool worker: one engine-vs-engine game. Returns +1 if the engine with
+    weights_a wins, -1 if weights_b wins and 0 for a draw.
+    """
+    weights_a, weights_b, a_first, size, time_limit_ms, min_simulations, seed = args
+    engine_a = MCTS_AI(weights_file=None, seed=seed)
+    engine_b = MCTS_AI(weights_file=None, seed=seed + 1)
+    engine_a.pattern_scores.update(weights_a)
+    engine_b.pattern_scores.update(weights_b)
+    engines = {AI_PLAYER: engine_a, HUMAN_PLAYER: engine_b} if a_first else {AI_PLAYER: engine_b, HUMAN_PLAYER: engine_a}
+
+    game = GomokuGame(size=size, current_player=AI_PLAYER)
+    winner = None
+    while winner is None:
+        player = game.current_player
+        move, _ = engines[player].find_best_move(game.clone(), time_limit_ms, min_simulations)
+        game.make_move(move, player)
+        winner = game.check_winner()
+        game.current_player = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
+
+    if winner == 'draw':
+        return 0
+    return 1 if engines[winner] is engine_a else -1
+
+
+def _clamp(theta):
+    return [min(value, math.log(WEIGHT_CAPS[key])) for key, value in zip(TUNED_KEYS, theta)]
+
+
+def _to_weights(theta):
+    return {key: min(math.exp(value), WEIGHT_CAPS[key]) for key, value in zip(TUNED_KEYS, theta)}
+
+
+def write_weights(path, weights):
+    with open(path, 'w') as f:
+        json.dump({key: round(value, 3) for key, value in weights.items()}, f, indent=4)
+
+
+def tune(iterations=50, games_per_iteration=16, size=9, time_limit_ms=200, min_simulations=50,
+         out_path=WEIGHTS_FILE, processes=None, a=0.1, c=0.2, seed=None):
+    """
+    SPSA in log-weight space. Every iteration perturbs all tuned weights at
+    once by +/- c_k, plays games_per_iteration games between the two
+    perturbations (colours alternating) across a process pool, and steps along
+    the estimated gradient of the match score, kept within WEIGHT_CAPS. The
+    current weights are written to out_path after every iteration, so an
+    interrupted run keeps its progress.
+    """
+    from multiprocessing import Pool
+
+    rng = random.Random(seed)
+    start = MCTS_AI().pattern_scores
+    theta = _clamp([math.log(start[key]) for key in TUNED_KEYS])
+    stability = iterations / 10
+
+    with Pool(processes) as pool:
+        for k in range(iterations):
+            a_k = a / (k + 1 + stability) ** 0.602
+            c_k = c / (k + 1) ** 0.101
+            delta = [rng.choice((-1, 1)) for _ in theta]
+            plus = _to_weights([t + c_k * d for t, d in zip(theta, delta)])
+            minus = _to_weights([t - c_k * d for t, d in zip(theta, delta)])
+
+            jobs = [(plus, minus, game_no % 2 == 0, size, time_limit_ms, min_simulations, rng.getrandbits(32))
+                    for game_no in range(games_per_iteration)]
+            score = sum(pool.imap_unordered(play_game, jobs)) / games_per_iteration
+
+            theta = _clamp([t + a_k * score / (2 * c_k) * d for t, d in zip(theta, delta)])
+            weights = _to_weights(theta)
+            write_weights(out_path, weights)
+            print(f"iteration {k + 1}/{iterations}: plus-vs-minus score {score:+.2f}, "
+                  + ", ".join(f"{key}={value:.1f}" for key, value in weights.items()))
+    return _to_weights(theta)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tune MCTS pattern weights with SPSA self-play.")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--games', type=int, default=16, help="games per iteration (even, colours alternate)")
+    parser.add_argument('--size', type=int, default=9)
+    parser.add_argument('--time-ms', type=int, default=200, help="search time per move")
+    parser.add_argument('--sims', type=int, default=50, help="minimum simulations per move")
+    parser.add_argument('--out', default=WEIGHTS_FILE)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    cli_args = parser.parse_args()
+
+    tune(cli_args.iterations, cli_args.games, cli_args.size, cli_args.time_ms, cli_args.sims, cli_args.out,
+         cli_args.processes, seed=cli_args.seed)
@@ -2,39 +2,68 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, Toplevel, scrolledtext
 import json
-import threading
 import random
 import queue
 
-from gomoku_game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
-from mcts_ai import MCTS_AI
+from gomoku.game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from gomoku.profiles import PROFILES, DEFAULT_PROFILE, get_profile
+from gomoku.opening_book import OpeningBook
+from gomoku.search_cache import SearchCache
+from gomoku.game_archive import GameArchive, add_result_to_stats
+from gomoku.search_worker import SearchWorker
 
 # --- Constants ---
 BOARD_SIZE = 9
 CELL_SIZE = 50
 PADDING = 25
-STATS_FILE = 'stats.json'
-LOG_FILE = 'last_game_log.json'
+# Stats saved before the game archive existed; read once and merged, never rewritten.
+LEGACY_STATS_FILE = 'stats.json'
+ARCHIVE_PATH = 'game_archive'
+BOOK_FILE = 'opening_book.bin'
+# Search statistics of the default level; other levels get their own file so
+# root priors never mix search qualities (see _search_cache_for)
+CACHE_FILE = 'search_cache.sqlite'
+LEVEL_CACHE_FILE = 'search_cache_{}.sqlite'
+# Visualization log scrollback and how many queued events one frame may consume
+VIZ_MAX_LINES = 2000
+VIZ_EVENTS_PER_FRAME = 200
+GHOST_POOL_SIZE = 5
 
 
 class GomokuGUI(tk.Tk):
-    def __init__(self):
+    def __init__(self, seed=None):
         super().__init__()
         self.title("Gomoku AI")
         self.resizable(False, False)
 
         self.game = None
         self.ai = None
+        self.profile = None
         self.game_over = True
         self.game_log = []
-
+        # One long-lived search thread; search_handle is the search whose result we still want
+        self.search_worker = SearchWorker()
+        self.search_handle = None
+        # Who starts and every engine seed come from here, so a seeded session replays identically
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self.archive = GameArchive(ARCHIVE_PATH)
         self.stats = self._load_stats()
+        self.opening_book = self._load_opening_book()
+        self.search_caches = {}  # Profile name -> SearchCache, opened on first use
 
         # Visualization state
         self.viz_enabled = False
         self.viz_queue = queue.Queue()
         self.viz_update_rate = 10  # Process every Nth iteration
-        self.ghost_pieces = []  # Track canvas items for ghost pieces
+        self.ghost_pieces = []  # Pooled ghost ovals, created once and hidden when unused
+        self.pending_ghosts = None  # (moves, phase) to show at the next frame
+        self.viz_buffer = []  # (text, tag) pairs waiting for the next frame
+
+        # Board view: the grid is drawn once, stones are added/removed per cell
+        self.stone_items = {}
+        self.last_move_dot = None
 
         self._create_widgets()
 
@@ -47,21 +76,39 @@ class GomokuGUI(tk.Tk):
 
     def _on_closing(self):
         """Handle the window closing event to clean up resources."""
-        # No pool to close in this architecture, just destroy.
+        # Stop any running search, release the opening book and the search caches, then destroy.
+        self._cancel_search()
+        self.search_worker.shutdown()
+        if self.opening_book is not None:
+            self.opening_book.close()
+        for cache in self.search_caches.values():
+            cache.close()
         self.destroy()
 
+    def _search_cache_for(self, profile):
+        if profile.name not in self.search_caches:
+            path = CACHE_FILE if profile.name == DEFAULT_PROFILE else LEVEL_CACHE_FILE.format(profile.name)
+            self.search_caches[profile.name] = SearchCache(path)
+        return self.search_caches[profile.name]
+
     def _load_stats(self):
+        stats = self.archive.stats()
         try:
-            with open(STATS_FILE, 'r') as f:
-                return json.load(f)
+            with open(LEGACY_STATS_FILE, 'r') as f:
+                legacy_stats = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-
-    def _save_stats(self):
-        with open(STATS_FILE, 'w') as f: json.dump(self.stats, f, indent=4)
-
-    def _save_log(self):
-        with open(LOG_FILE, 'w') as f: json.dump(self.game_log, f, indent=4)
+            return stats
+        for time_key, data in legacy_stats.items():
+            merged = stats.setdefault(time_key, {'wins': 0, 'losses': 0, 'total': 0})
+            for field in ('wins', 'losses', 'total'):
+                merged[field] += data.get(field, 0)
+        return stats
+
+    def _load_opening_book(self):
+        try:
+            return OpeningBook(BOOK_FILE)
+        except (FileNotFoundError, ValueError):
+            return None
 
     def _create_widgets(self):
         main_frame = ttk.Frame(self, padding=10);
@@ -79,6 +126,7 @@ class GomokuGUI(tk.Tk):
         self.canvas = tk.Canvas(board_frame, width=canvas_size, height=canvas_size, bg='#d2b48c');
         self.canvas.pack()
         self.canvas.bind("<Button-1>", self._on_board_click)
+        self._create_board_items()
         self.turn_label = ttk.Label(self.info_frame, text="Start a new game", font=("Arial", 12));
         self.turn_label.pack(pady=5)
         ttk.Label(self.info_frame, text="AI Analysis", font=("Arial", 14, "bold")).pack(pady=5)
@@ -156,9 +204,9 @@ class GomokuGUI(tk.Tk):
         ttk.Entry(settings_frame, textvariable=sims_var, width=10).grid(row=1, column=1, sticky='e')
 
         ttk.Label(dialog, text="AI Difficulty Level:").pack(padx=20, pady=(10, 5), anchor='w')
-        heuristic_var = tk.StringVar(value='pattern')
-        ttk.Radiobutton(dialog, text="Dim Opponent", variable=heuristic_var, value='pattern').pack(anchor='w', padx=20)
-        ttk.Radiobutton(dialog, text="Goldfish", variable=heuristic_var, value='random').pack(anchor='w', padx=20)
+        heuristic_var = tk.StringVar(value=DEFAULT_PROFILE)
+        for profile in PROFILES.values():
+            ttk.Radiobutton(dialog, text=profile.label, variable=heuristic_var, value=profile.name).pack(anchor='w', padx=20)
 
         def on_start():
             try:
@@ -185,10 +233,14 @@ class GomokuGUI(tk.Tk):
         dialog.geometry(f"+{x}+{y}")
 
     def _start_new_game(self):
+        self._cancel_search()
         self.game_log = []
-        first_player = random.choice([HUMAN_PLAYER, AI_PLAYER])
+        first_player = self.rng.choice([HUMAN_PLAYER, AI_PLAYER])
         self.game = GomokuGame(size=BOARD_SIZE, current_player=first_player)
-        self.ai = MCTS_AI(heuristic_method=self.settings.get('heuristic', 'pattern'))
+        self.profile = get_profile(self.settings.get('heuristic', DEFAULT_PROFILE))
+        self.ai = self.profile.create_engine(opening_book=self.opening_book,
+                                             search_cache=self._search_cache_for(self.profile),
+                                             seed=self.rng.getrandbits(32) if self.seed is not None else None)
 
         # Set up visualization callback
         self.ai.visualization_callback = self._viz_callback
@@ -205,29 +257,46 @@ class GomokuGUI(tk.Tk):
             self._update_turn_label()
             self.after(500, self._ai_turn)
 
-    def _draw_board(self):
-        self.canvas.delete("all")
+    def _create_board_items(self):
+        """Grid, last-move dot and ghost pool; these items live for the whole session."""
         for i in range(BOARD_SIZE):
             x = PADDING + i * CELL_SIZE
             self.canvas.create_line(x, PADDING, x, PADDING + (BOARD_SIZE - 1) * CELL_SIZE, fill='black')
             self.canvas.create_line(PADDING, x, PADDING + (BOARD_SIZE - 1) * CELL_SIZE, x, fill='black')
+        self.last_move_dot = self.canvas.create_oval(0, 0, 0, 0, outline="", state='hidden', tags='dot')
+        for _ in range(GHOST_POOL_SIZE):
+            self.ghost_pieces.append(self.canvas.create_oval(0, 0, 0, 0, outline='gray', stipple='gray50',
+                                                             state='hidden', tags='ghost'))
+
+    def _draw_board(self):
+        """Brings the stones on the canvas in line with the board, touching only cells that changed."""
+        for i in [i for i in self.stone_items if self.game.board[i] == ' ']:
+            self.canvas.delete(self.stone_items.pop(i))
         for i, player in enumerate(self.game.board):
-            if player != ' ':
+            if player != ' ' and i not in self.stone_items:
                 row, col = divmod(i, BOARD_SIZE)
                 x0 = PADDING + col * CELL_SIZE - CELL_SIZE // 2 + 2;
                 y0 = PADDING + row * CELL_SIZE - CELL_SIZE // 2 + 2
                 x1 = PADDING + col * CELL_SIZE + CELL_SIZE // 2 - 2;
                 y1 = PADDING + row * CELL_SIZE + CELL_SIZE // 2 - 2
                 color = 'black' if player == AI_PLAYER else 'white'
-                self.canvas.create_oval(x0, y0, x1, y1, fill=color, outline='black')
-                if i == self.game.last_move:
-                    center_x = PADDING + col * CELL_SIZE;
-                    center_y = PADDING + row * CELL_SIZE
-                    dot_radius = CELL_SIZE // 8
-                    dot_x0, dot_y0 = center_x - dot_radius, center_y - dot_radius
-                    dot_x1, dot_y1 = center_x + dot_radius, center_y + dot_radius
-                    highlight_color = 'white' if player == AI_PLAYER else 'black'
-                    self.canvas.create_oval(dot_x0, dot_y0, dot_x1, dot_y1, fill=highlight_color, outline="")
+                self.stone_items[i] = self.canvas.create_oval(x0, y0, x1, y1, fill=color, outline='black',
+                                                              tags='stone')
+                # Keep stones under the last-move dot and the ghost pieces
+                self.canvas.tag_lower(self.stone_items[i], 'dot')
+
+        last_move = self.game.last_move
+        if last_move < 0 or self.game.board[last_move] == ' ':
+            self.canvas.itemconfig(self.last_move_dot, state='hidden')
+            return
+        row, col = divmod(last_move, BOARD_SIZE)
+        center_x = PADDING + col * CELL_SIZE;
+        center_y = PADDING + row * CELL_SIZE
+        dot_radius = CELL_SIZE // 8
+        highlight_color = 'white' if self.game.board[last_move] == AI_PLAYER else 'black'
+        self.canvas.coords(self.last_move_dot, center_x - dot_radius, center_y - dot_radius,
+                           center_x + dot_radius, center_y + dot_radius)
+        self.canvas.itemconfig(self.last_move_dot, fill=highlight_color, state='normal')
 
     def _on_board_click(self, event):
         if self.game_over or self.game.current_player != HUMAN_PLAYER: return
@@ -254,16 +323,23 @@ class GomokuGUI(tk.Tk):
         self._update_mcts_text("AI is thinking...")
         self._clear_ghost_pieces()  # Clear any lingering ghost pieces
         self.update_idletasks()  # Force UI update before AI starts
-        thread = threading.Thread(target=self._ai_worker, daemon=True);
-        thread.start()
+        time_limit_ms, min_simulations = self.profile.budget(self.settings['time_limit_ms'],
+                                                             self.settings['min_simulations'])
+        self.search_handle = self.search_worker.submit(self.ai, self.game.clone(), time_limit_ms, min_simulations)
+        self.search_handle.add_done_callback(lambda handle: self.after(0, self._on_search_done, handle))
+
+    def _on_search_done(self, handle):
+        # Ignore searches that were cancelled or belong to a game that has since been replaced
+        if handle is not self.search_handle or handle.cancelled():
+            return
+        self.search_handle = None
+        ai_move, root_node = handle.result()
+        self._process_ai_move(ai_move, root_node)
 
-    def _ai_worker(self):
-        ai_move, root_node = self.ai.find_best_move(
-            self.game.clone(),
-            self.settings['time_limit_ms'],
-            self.settings['min_simulations']
-        )
-        self.after(0, self._process_ai_move, ai_move, root_node)
+    def _cancel_search(self):
+        if self.search_handle is not None:
+            self.search_handle.cancel()
+            self.search_handle = None
 
     def _process_ai_move(self, move, root_node):
         analysis_data = {"total_simulations": root_node.visits, "top_moves": []}
@@ -289,15 +365,8 @@ class GomokuGUI(tk.Tk):
         else:
             message = f"Player {winner} wins!"
         messagebox.showinfo("Game Over", message);
-        self._save_log()
-        time_key = str(self.settings.get('time_limit_ms', 3000) / 1000)
-        if time_key not in self.stats: self.stats[time_key] = {'wins': 0, 'losses': 0, 'total': 0}
-        self.stats[time_key]['total'] += 1
-        if winner == HUMAN_PLAYER:
-            self.stats[time_key]['losses'] += 1
-        elif winner == AI_PLAYER:
-            self.stats[time_key]['wins'] += 1
-        self._save_stats();
+        self.archive.append(self.game_log, winner, self.settings, size=BOARD_SIZE)
+        add_result_to_stats(self.stats, self.settings.get('time_limit_ms', 3000), winner)
         self._update_stats_text()
 
     def _update_turn_label(self):
@@ -337,12 +406,11 @@ class GomokuGUI(tk.Tk):
         self.stats_text.config(state=tk.DISABLED)
 
     def _show_log_window(self):
-        try:
-            with open(LOG_FILE, 'r') as f:
-                log_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        last_entry = self.archive.last_entry()
+        if last_entry is None:
             messagebox.showinfo("Log Viewer", "No game log found. Play a game to create one.");
             return
+        log_data = self.archive.read_game(last_entry)['log']
         dialog = Toplevel(self);
         dialog.title("Last Game Log");
         dialog.geometry("500x600")
@@ -386,11 +454,23 @@ class GomokuGUI(tk.Tk):
 
     def _clear_viz_log(self):
         """Clear the visualization text log."""
+        self.viz_buffer = []
         self.viz_text.delete(1.0, tk.END)
 
     def _append_viz_text(self, text, tag=None):
-        """Append text to the visualization log."""
-        self.viz_text.insert(tk.END, text, tag)
+        """Queue text for the visualization log; written out once per frame by _flush_viz_text."""
+        self.viz_buffer.append((text, tag or ''))
+
+    def _flush_viz_text(self):
+        """Writes the buffered text in one insert and trims the log to VIZ_MAX_LINES."""
+        if not self.viz_buffer:
+            return
+        chunks = [part for pair in self.viz_buffer for part in pair]
+        self.viz_buffer = []
+        self.viz_text.insert(tk.END, *chunks)
+        excess = int(self.viz_text.index('end-1c').split('.')[0]) - VIZ_MAX_LINES
+        if excess > 0:
+            self.viz_text.delete('1.0', f'{excess + 1}.0')
         self.viz_text.see(tk.END)
 
     def _viz_callback(self, event_type, data):
@@ -409,18 +489,17 @@ class GomokuGUI(tk.Tk):
             self.viz_queue.put((event_type, data))
 
     def _process_viz_queue(self):
-        """Process visualization events from the queue."""
+        """Process visualization events from the queue, then render them as one frame."""
         try:
-            # Process up to 10 events per cycle to avoid overwhelming the UI
-            for _ in range(10):
-                if not self.viz_queue.empty():
-                    event_type, data = self.viz_queue.get_nowait()
-                    self._handle_viz_event(event_type, data)
-                else:
-                    break
+            # Handling an event only buffers text and ghost positions, so a frame can take many
+            for _ in range(VIZ_EVENTS_PER_FRAME):
+                event_type, data = self.viz_queue.get_nowait()
+                self._handle_viz_event(event_type, data)
         except queue.Empty:
             pass
         finally:
+            self._flush_viz_text()
+            self._render_ghosts()
             # Schedule next processing - faster cycle for real-time updates
             self.after(16, self._process_viz_queue)  # ~60fps
 
@@ -436,6 +515,10 @@ class GomokuGUI(tk.Tk):
             self._append_viz_text(f"IMMEDIATE MOVE DETECTED\n", "phase")
             self._append_viz_text(f"Move: {data['move']}, Reason: {data['reason']}, Score: {data['score']}\n\n", "info")
 
+        elif event_type == 'book_move':
+            self._append_viz_text(f"OPENING BOOK MOVE\n", "phase")
+            self._append_viz_text(f"Move: {data['move']}, Visits: {data['visits']}\n\n", "info")
+
         elif event_type == 'iteration_start':
             if data['iteration'] % self.viz_update_rate == 0:
                 self._append_viz_text(f"--- Iteration {data['iteration']} ---\n", "info")
@@ -471,21 +554,31 @@ class GomokuGUI(tk.Tk):
         elif event_type == 'search_complete':
             self._append_viz_text(f"\n{'='*40}\n", "phase")
             self._append_viz_text(f"SEARCH COMPLETE\n", "phase")
-            self._append_viz_text(f"Total iterations: {data['total_iterations']}, Time: {data['time_elapsed']:.1f}ms\n", "info")
+            self._append_viz_text(f"Total iterations: {data['total_iterations']}, Time: {data['time_elapsed']:.1f}ms, "
+                                  f"Stopped: {data['stop_reason']}\n", "info")
+            self._append_viz_text(f"Tree: {data['tree_nodes']} nodes, ~{data['tree_bytes'] / 1024:.0f} KB, "
+                                  f"pruned: {data['pruned_nodes']}\n", "info")
             self._append_viz_text(f"{'='*40}\n\n", "phase")
             self._clear_ghost_pieces()
 
     def _clear_ghost_pieces(self):
-        """Clear all ghost pieces from the board."""
+        """Hide all ghost pieces (they stay in the pool for reuse)."""
+        self.pending_ghosts = None
         for item in self.ghost_pieces:
-            self.canvas.delete(item)
-        self.ghost_pieces = []
+            self.canvas.itemconfig(item, state='hidden')
 
     def _draw_ghost_path(self, moves, phase):
-        """Draw ghost pieces for a path of moves."""
+        """Show ghost pieces for a path of moves at the next frame; only the latest path per frame is drawn."""
         if not self.game:
             return
-        self._clear_ghost_pieces()
+        self.pending_ghosts = (moves, phase)
+
+    def _render_ghosts(self):
+        """Moves the pooled ghost ovals onto the pending path."""
+        if self.pending_ghosts is None:
+            return
+        moves, phase = self.pending_ghosts
+        self.pending_ghosts = None
 
         colors = {
             'selection': '#90EE90',  # Light green
@@ -494,31 +587,28 @@ class GomokuGUI(tk.Tk):
         }
         color = colors.get(phase, '#CCCCCC')
 
-        for i, move in enumerate(moves[:5]):  # Only show first 5
-            if move is None:
-                continue
+        shown = [move for move in moves[:GHOST_POOL_SIZE] if move is not None]
+        for item, move in zip(self.ghost_pieces, shown):
             row, col = divmod(move, BOARD_SIZE)
             x0 = PADDING + col * CELL_SIZE - CELL_SIZE // 3
             y0 = PADDING + row * CELL_SIZE - CELL_SIZE // 3
             x1 = PADDING + col * CELL_SIZE + CELL_SIZE // 3
             y1 = PADDING + row * CELL_SIZE + CELL_SIZE // 3
-
-            # Fade opacity for later moves
-            opacity = 255 - (i * 40)
-            if opacity < 100:
-                opacity = 100
-
-            item = self.canvas.create_oval(x0, y0, x1, y1,
-                                           fill=color,
-                                           outline='gray',
-                                           stipple='gray50',
-                                           tags='ghost')
-            self.ghost_pieces.append(item)
+            self.canvas.coords(item, x0, y0, x1, y1)
+            self.canvas.itemconfig(item, fill=color, state='normal')
+        for item in self.ghost_pieces[len(shown):]:
+            self.canvas.itemconfig(item, state='hidden')
 
     def _draw_ghost_candidates(self, moves, phase):
         """Draw ghost pieces for candidate moves."""
         self._draw_ghost_path(moves, phase)
 
 if __name__ == "__main__":
-    app = GomokuGUI()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Play Gomoku against the MCTS engine.")
+    parser.add_argument('--seed', type=int, default=None, help="seed who starts and the engine, for reproducible games")
+    cli_args = parser.parse_args()
+
+    app = GomokuGUI(seed=cli_args.seed)
     app.mainloop()
\ No newline at end of file
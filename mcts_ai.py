@@ -1,365 +0,0 @@
-# mcts_ai.py
-import math
-import random
-import time
-from gomoku_game import AI_PLAYER, HUMAN_PLAYER
-
-
-class MCTSNode:
-    def __init__(self, game_state, parent=None, move=None):
-        self.game_state = game_state
-        self.parent = parent
-        self.move = move
-        self.children = []
-        self.wins = 0
-        self.visits = 0
-        self.untried_moves = game_state.get_legal_moves()
-
-    def ucb1(self, exploration_constant=1.41):
-        if self.visits == 0:
-            return float('inf')
-        return (self.wins / self.visits) + exploration_constant * math.sqrt(math.log(self.parent.visits) / self.visits)
-
-    def add_child(self, move, new_state):
-        child = MCTSNode(game_state=new_state, parent=self, move=move)
-        self.children.append(child)
-        self.untried_moves.remove(move)
-        return child
-
-
-class MCTS_AI:
-    def __init__(self, heuristic_method='pattern'):
-        self.heuristic_method = heuristic_method
-        self.pattern_scores = {
-            'win': 1000000,
-            'block_win': 500000,
-            'open_four': 10000,
-            'block_open_four': 20000,
-            'open_three': 5000,
-            'block_open_three': 50000,
-            'dev_own': 2,
-            'dev_opp': 1,
-        }
-        self.visualization_callback = None
-        self.visualization_enabled = False
-
-    # --- YOUR POWERFUL HEURISTIC FUNCTIONS ---
-    def _score_move(self, game_state, move, player):
-        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
-        size = game_state.size
-        score = 0
-
-        temp_game_win = game_state.clone()
-        temp_game_win.make_move(move, player)
-        if temp_game_win.check_winner(fast_check=True) == player:
-            return self.pattern_scores['win']
-
-        temp_game_block = game_state.clone()
-        temp_game_block.make_move(move, opponent)
-        if temp_game_block.check_winner(fast_check=True) == opponent:
-            score += self.pattern_scores['block_win']
-
-        threat_moves = self._scan_for_existing_threats(game_state.board, opponent, size)
-        if move in threat_moves:
-            score += self.pattern_scores['block_open_three'] * 10
-
-        if self._detect_open_three_threat(game_state.board, move, opponent, size):
-            score += self.pattern_scores['block_open_three'] * 5
-
-        if self._detect_open_three_threat(game_state.board, move, player, size):
-            score += self.pattern_scores['open_three']
-
-        board_after_move = list(game_state.board)
-        board_after_move[move] = player
-        score += self._count_patterns_on_board(
-            board_after_move, move, player, size, f" {player * 4} ", self.pattern_scores['open_four']
-        )
-
-        r, c = divmod(move, size)
-        for ro in (-1, 0, 1):
-            for co in (-1, 0, 1):
-                if ro == 0 and co == 0:
-                    continue
-                nr, nc = r + ro, c + co
-                if 0 <= nr < size and 0 <= nc < size:
-                    neighbor = game_state.board[nr * size + nc]
-                    if neighbor == player:
-                        score += self.pattern_scores['dev_own']
-                    elif neighbor == opponent:
-                        score += self.pattern_scores['dev_opp']
-        return score
-
-    def _count_patterns_on_board(self, board, move, player, size, pattern, score_value):
-        r, c = divmod(move, size)
-        total_score = 0
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for dr, dc in directions:
-            line = ""
-            for i in range(-4, 5):
-                nr, nc = r + i * dr, c + i * dc
-                if 0 <= nr < size and 0 <= nc < size:
-                    line += board[nr * size + nc]
-                else:
-                    line += "#"
-            if pattern in line:
-                total_score += score_value
-        return total_score
-
-    def _get_scored_moves(self, game_state):
-        moves_with_scores = []
-        for move in game_state.get_legal_moves():
-            score = self._score_move(game_state, move, game_state.current_player)
-            moves_with_scores.append((score, move))
-        return sorted(moves_with_scores, key=lambda x: x[0], reverse=True)
-
-    def _scan_for_existing_threats(self, board, player, size):
-        threat_moves = set()
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for pos in range(size * size):
-            if board[pos] != player:
-                continue
-            r, c = divmod(pos, size)
-            for dr, dc in directions:
-                line_positions, line_chars = [], []
-                for i in range(-2, 4):
-                    nr, nc = r + i * dr, c + i * dc
-                    if 0 <= nr < size and 0 <= nc < size:
-                        line_positions.append(nr * size + nc)
-                        cell = board[nr * size + nc]
-                        line_chars.append('X' if cell == player else '_' if cell == ' ' else 'O')
-                    else:
-                        line_positions.append(None)
-                        line_chars.append('#')
-                line_str = ''.join(line_chars)
-                if '_XXX_' in line_str:
-                    idx = line_str.find('_XXX_')
-                    threat_moves.add(line_positions[idx])
-                    threat_moves.add(line_positions[idx + 4])
-                if '_XX_X_' in line_str:
-                    threat_moves.add(line_positions[line_str.find('_XX_X_') + 3])
-                if '_X_XX_' in line_str:
-                    threat_moves.add(line_positions[line_str.find('_X_XX_') + 2])
-                if 'XXXX' in line_str:
-                    idx = line_str.find('XXXX')
-                    if idx > 0 and line_chars[idx - 1] == '_':
-                        threat_moves.add(line_positions[idx - 1])
-                    if idx + 4 < len(line_positions) and line_chars[idx + 4] == '_':
-                        threat_moves.add(line_positions[idx + 4])
-        return list(filter(None, threat_moves))
-
-    def _detect_open_three_threat(self, board, move, player, size):
-        r, c = divmod(move, size)
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        temp_board = list(board)
-        temp_board[move] = player
-        for dr, dc in directions:
-            consecutive, open_ends = 1, 0
-            for i in range(1, 5):
-                nr, nc = r + i * dr, c + i * dc
-                if 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == player:
-                    consecutive += 1
-                elif 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == ' ':
-                    open_ends += 1
-                    break
-                else:
-                    break
-            for i in range(1, 5):
-                nr, nc = r - i * dr, c - i * dc
-                if 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == player:
-                    consecutive += 1
-                elif 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == ' ':
-                    open_ends += 1
-                    break
-                else:
-                    break
-            if consecutive == 3 and open_ends == 2:
-                return True
-        return False
-
-    def _get_fast_playout_move(self, game_state):
-        """
-        ULTRA-FAST, clone-free heuristic for simulations.
-        """
-        legal_moves = game_state.get_legal_moves()
-        if not legal_moves:
-            return None
-        player = game_state.current_player
-        opponent = HUMAN_PLAYER if player == AI_PLAYER else AI_PLAYER
-        size = game_state.size
-        board = game_state.board
-
-        # This is a much faster, clone-free way to check for immediate win/loss
-        for move in legal_moves:
-            if self._check_win_at_position(board, move, player, size):
-                return move
-        for move in legal_moves:
-            if self._check_win_at_position(board, move, opponent, size):
-                return move
-
-        # Fallback to local moves
-        occupied = {i for i, spot in enumerate(board) if spot != ' '}
-        if not occupied:
-            return random.choice(legal_moves)
-        local_moves = set()
-        for move in occupied:
-            r, c = divmod(move, size)
-            for ro in (-1, 0, 1):
-                for co in (-1, 0, 1):
-                    if ro == 0 and co == 0:
-                        continue
-                    nr, nc = r + ro, c + co
-                    if 0 <= nr < size and 0 <= nc < size and board[nr * size + nc] == ' ':
-                        local_moves.add(nr * size + nc)
-        return random.choice(list(local_moves)) if local_moves else random.choice(legal_moves)
-
-    def _check_win_at_position(self, board, pos, player, size):
-        """Fast check if placing a stone at pos would create 5 in a row."""
-        r, c = divmod(pos, size)
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        temp_board = list(board)
-        temp_board[pos] = player  # Fast shallow copy
-        for dr, dc in directions:
-            count = 1
-            for i in range(1, 5):
-                nr, nc = r + i * dr, c + i * dc
-                if 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == player:
-                    count += 1
-                else:
-                    break
-            for i in range(1, 5):
-                nr, nc = r - i * dr, c - i * dc
-                if 0 <= nr < size and 0 <= nc < size and temp_board[nr * size + nc] == player:
-                    count += 1
-                else:
-                    break
-            if count >= 5:
-                return True
-        return False
-
-    def _viz_event(self, event_type, data):
-        """Send visualization event if enabled."""
-        if self.visualization_enabled and self.visualization_callback:
-            self.visualization_callback(event_type, data)
-            # Small delay to allow GUI to process events in real-time
-            # Only delay for iteration-level events to give GUI time to render
-            if event_type in ['selection', 'expansion', 'simulation', 'backpropagation']:
-                time.sleep(0.02)  # 20ms delay allows ~50 updates/sec
-
-    def find_best_move(self, root_state, time_limit_ms, min_simulations):
-        if not any(s != ' ' for s in root_state.board):
-            center = (root_state.size // 2) * root_state.size + (root_state.size // 2)
-            dummy_node = MCTSNode(game_state=root_state)
-            dummy_node.visits = 1
-            return center, dummy_node
-
-        initial_scored_moves = self._get_scored_moves(root_state)
-        if initial_scored_moves:
-            best_initial_score, best_initial_move = initial_scored_moves[0]
-            if best_initial_score >= self.pattern_scores['block_win']:
-                self._viz_event('immediate_move', {
-                    'move': best_initial_move,
-                    'score': best_initial_score,
-                    'reason': 'win' if best_initial_score == self.pattern_scores['win'] else 'block_win'
-                })
-                dummy_node = MCTSNode(game_state=root_state)
-                dummy_node.visits = 1
-                child_node = dummy_node.add_child(best_initial_move, root_state)
-                child_node.wins = 1
-                child_node.visits = 1
-                return best_initial_move, dummy_node
-
-        root_node = MCTSNode(game_state=root_state)
-        start_time = time.monotonic()
-        time_limit_secs = time_limit_ms / 1000.0
-        simulations_run = 0
-
-        self._viz_event('search_start', {'time_limit_ms': time_limit_ms, 'min_simulations': min_simulations})
-
-        while (time.monotonic() - start_time) < time_limit_secs or simulations_run < min_simulations:
-            simulations_run += 1
-            self._viz_event('iteration_start', {'iteration': simulations_run})
-
-            # --- SELECTION PHASE ---
-            node = root_node
-            state = root_state.clone()
-            selection_path = []
-            while not node.untried_moves and node.children:
-                node = max(node.children, key=lambda n: n.ucb1())
-                selection_path.append(node.move)
-                state.make_move(node.move, state.current_player)
-                state.current_player = HUMAN_PLAYER if state.current_player == AI_PLAYER else AI_PLAYER
-
-            if selection_path:
-                self._viz_event('selection', {'path': selection_path, 'ucb_scores': [(c.move, c.ucb1()) for c in node.parent.children if c.parent]})
-
-            # --- EXPANSION PHASE ---
-            if node.untried_moves:
-                scored_untried_moves = []
-                for candidate in node.untried_moves:
-                    s = self._score_move(state, candidate, state.current_player)
-                    scored_untried_moves.append((s, candidate))
-
-                self._viz_event('expansion', {
-                    'candidates': scored_untried_moves[:10],
-                    'node_move': node.move
-                })
-
-                if scored_untried_moves:
-                    scored_untried_moves.sort(key=lambda x: x[0], reverse=True)
-                    top_moves = [m for _, m in scored_untried_moves[:5]]
-                    move = random.choice(top_moves)
-                else:
-                    move = random.choice(node.untried_moves)
-                state.make_move(move, state.current_player)
-                state.current_player = HUMAN_PLAYER if state.current_player == AI_PLAYER else AI_PLAYER
-                node = node.add_child(move, state)
-
-            # --- SIMULATION PHASE ---
-            current_rollout_state = state.clone()
-            simulation_moves = []
-            while current_rollout_state.check_winner(fast_check=True) is None:
-                move = self._get_fast_playout_move(current_rollout_state)
-                if move is None:
-                    break
-                simulation_moves.append(move)
-                current_rollout_state.make_move(move, current_rollout_state.current_player)
-                current_rollout_state.current_player = HUMAN_PLAYER if current_rollout_state.current_player == AI_PLAYER else AI_PLAYER
-            winner = current_rollout_state.check_winner(fast_check=True)
-
-            self._viz_event('simulation', {
-                'moves': simulation_moves[:5],  # Only show first 5 moves
-                'winner': winner,
-                'length': len(simulation_moves)
-            })
-
-            # --- BACKPROPAGATION PHASE ---
-            backprop_path = []
-            temp_node = node
-            while temp_node is not None:
-                backprop_path.append(temp_node.move)
-                temp_node = temp_node.parent
-
-            self._viz_event('backpropagation', {
-                'path': [m for m in backprop_path if m is not None],
-                'winner': winner
-            })
-
-            while node is not None:
-                node.visits += 1
-                if node.parent:
-                    player_who_moved = node.parent.game_state.current_player
-                    if winner == player_who_moved:
-                        node.wins += 1
-                    elif winner == 'draw':
-                        node.wins += 0.5
-                node = node.parent
-
-        self._viz_event('search_complete', {
-            'total_iterations': simulations_run,
-            'time_elapsed': (time.monotonic() - start_time) * 1000
-        })
-
-        if not root_node.children:
-            return random.choice(root_state.get_legal_moves()), root_node
-        best_child = max(root_node.children, key=lambda n: n.visits)
-        return best_child.move, root_node
\ No newline at end of file
@@ -0,0 +1,24 @@
+# quick test: a seeded engine with a fixed iteration count builds the same tree every run
+from gomoku.game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from gomoku.mcts import MCTS_AI
+from gomoku.time_control import FixedIterations
+
+
+def search(seed, iterations=300):
+    game = GomokuGame(size=9, current_player=AI_PLAYER)
+    for move, player in ((40, HUMAN_PLAYER), (41, AI_PLAYER), (31, HUMAN_PLAYER)):
+        game.make_move(move, player)
+    ai = MCTS_AI(time_control=FixedIterations(iterations), seed=seed, weights_file=None)
+    move, root_node = ai.find_best_move(game, 1, 1)
+    stats = sorted((child.move, child.visits, child.wins) for child in root_node.children)
+    return move, root_node.visits, stats
+
+
+first = search(seed=7)
+assert first[1] == 300, first[1]
+assert search(seed=7) == first, "same seed, different tree"
+print('seed 7 twice: identical move and root statistics', first[0])
+
+others = [search(seed=s)[2] for s in (8, 9, 10)]
+assert any(stats != first[2] for stats in others), "seed has no effect"
+print('other seeds give different trees')
@@ -0,0 +1,108 @@
+# quick test: drive the engine server with the local stand-in client and the Gomocup protocol over text streams
+import asyncio
+import io
+
+from gomoku.engine_server import EngineWorkerPool, EngineServer, EngineClient, GomocupProtocol
+
+
+async def play_games(pool, games=3, turns=3):
+    server = await EngineServer(pool).start()
+    client = await EngineClient(server.host, server.port).connect()
+
+    async def play(game_id, opening_move):
+        await client.request(game_id, 'new', size=9, time_limit_ms=50, min_simulations=1)
+        moves = []
+        await client.request(game_id, 'move', move=opening_move)
+        for _ in range(turns):
+            reply = await client.request(game_id, 'think')
+            assert 'error' not in reply, reply
+            moves.append(reply['move'])
+            free = next(m for m in range(81) if m != opening_move and m not in moves)
+            await client.request(game_id, 'move', move=free)
+            moves.append(free)
+        await client.request(game_id, 'end')
+        return moves
+
+    results = await asyncio.gather(*(play(f"game-{i}", 40 + i) for i in range(games)))
+    await client.close()
+    await server.close()
+    return results
+
+
+for processes in (0, 2):
+    pool = EngineWorkerPool(processes=processes)
+    for game_moves in asyncio.run(play_games(pool)):
+        assert len(set(game_moves)) == len(game_moves), game_moves
+    pool.close()
+    print(f'processes={processes}: concurrent socket games OK')
+
+stdout = io.StringIO()
+pool = EngineWorkerPool(processes=0)
+brain = GomocupProtocol(pool, io.StringIO("ABOUT\nINFO timeout_turn 200\nSTART 9\nTURN 4,4\n"), stdout)
+brain.run()
+engine_move = stdout.getvalue().splitlines()[-1]
+# Take-backs must come newest first; the third one has nothing left to undo
+brain.stdin = io.StringIO(f"TAKEBACK 4,4\nTAKEBACK {engine_move}\nTAKEBACK 4,4\nTAKEBACK 4,4\n"
+                          "BOARD\n4,4,2\n3,3,1\nDONE\nEND\n")
+brain.run()
+pool.close()
+replies = stdout.getvalue().splitlines()
+print('Gomocup replies:', replies)
+assert replies[0].startswith('name=') and replies[1] == 'OK', replies
+assert replies[3].startswith('ERROR') and replies[4:6] == ['OK', 'OK'] and replies[6].startswith('ERROR'), replies
+assert all(len(reply.split(',')) == 2 for reply in (replies[2], replies[7])), replies
+
+
+async def admit_by_cost(pool):
+    # Capacity for one full-strength game at 1000 ms a move: a Goldfish game searches
+    # at most 300 ms of that, so three fit and a fourth does not
+    server = await EngineServer(pool, capacity=1.0).start()
+    client = await EngineClient(server.host, server.port).connect()
+    for i in range(3):
+        assert 'error' not in await client.request(f"cheap-{i}", 'new', size=9, level='random')
+    assert (await client.request('cheap-3', 'new', size=9, level='random')).get('error') == 'busy'
+    await client.request('cheap-0', 'move', move=40)
+    reply = await client.request('cheap-0', 'think')
+    assert 'error' not in reply and reply['simulations'] <= 200 and reply['tree_nodes'] <= 2000, reply
+    assert (await client.request('full', 'new', size=9, level='pattern')).get('error') == 'busy'
+    for i in range(3):
+        await client.request(f"cheap-{i}", 'end')
+    assert 'error' not in await client.request('full', 'new', size=9, level='pattern')
+    assert 'error' in await client.request('odd', 'new', level='grandmaster')
+
+    # Replacing a game also replaces the engine the worker keeps for it
+    await client.request('full', 'move', move=40)
+    await client.request('full', 'think')
+    assert pool._inline_state.engines['full'].heuristic_method == 'pattern'
+    assert 'error' not in await client.request('full', 'new', size=9, level='random')
+    await client.request('full', 'move', move=40)
+    await client.request('full', 'think')
+    assert pool._inline_state.engines['full'].heuristic_method == 'random'
+    await client.close()
+    await server.close()
+
+
+pool = EngineWorkerPool(processes=0)
+asyncio.run(admit_by_cost(pool))
+pool.close()
+print('games admitted by profile cost OK')
+
+
+async def bad_requests(pool):
+    server = await EngineServer(pool).start()
+    client = await EngineClient(server.host, server.port).connect()
+    await client.request('bad', 'new', size=5)
+    assert 'error' in await client.request('bad', 'move', move='a')
+    for move in range(5):  # The engine never gets a turn, so the opponent completes a five
+        reply = await client.request('bad', 'move', move=move)
+    assert reply['winner'] == 'O', reply
+    assert (await client.request('bad', 'think')).get('error') == 'game over'
+    assert (await client.request('bad', 'move', move=20)).get('error') == 'game over'
+    await client.close()
+    await server.close()
+
+
+pool = EngineWorkerPool(processes=0)
+asyncio.run(bad_requests(pool))
+pool.close()
+print('bad requests answered with errors OK')
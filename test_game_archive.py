@@ -0,0 +1,58 @@
+# quick test: archive round trip, and a torn index write must not break later reads or appends
+import os
+import tempfile
+
+from gomoku.game_archive import GameArchive, INDEX_ENTRY
+from gomoku.game import AI_PLAYER, HUMAN_PLAYER
+
+
+def make_log(moves, analysed=True):
+    log = []
+    for turn, move in enumerate(moves, 1):
+        entry = {"turn": turn, "player": "AI" if turn % 2 else "Human", "move": move}
+        if analysed and turn % 2:
+            entry["analysis"] = {"total_simulations": 100 + turn,
+                                 "top_moves": [{"move": move, "win_rate": 50.0, "visits": 60}]}
+        log.append(entry)
+    return log
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    archive = GameArchive(os.path.join(tmp, 'games'))
+    assert list(archive.index()) == [] and archive.last_entry() is None
+
+    games = [
+        (make_log([40, 41, 31, 32, 22]), AI_PLAYER, {'time_limit_ms': 1000, 'min_simulations': 50}),
+        (make_log([10, 11, 12], analysed=False), 'draw', {'time_limit_ms': 2000, 'heuristic': 'random'}),
+        (make_log([0, 1, 2, 3]), HUMAN_PLAYER, {'time_limit_ms': 1000, 'heuristic': 'deep'}),
+    ]
+    for log, winner, settings in games:
+        archive.append(log, winner, settings, timestamp=1000.0)
+    for (log, winner, settings), game in zip(games, archive.iter_games()):
+        assert game['log'] == log, (game['log'], log)
+        assert game['winner'] == winner
+        assert game['settings']['time_limit_ms'] == settings['time_limit_ms']
+    assert archive.stats() == {'1.0': {'wins': 1, 'losses': 1, 'total': 2},
+                               '2.0': {'wins': 0, 'losses': 0, 'total': 1}}
+
+    # A crash half way through an index write leaves a partial entry behind
+    with open(archive.index_path, 'ab') as f:
+        f.write(b'\x07' * (INDEX_ENTRY.size // 2))
+    assert len(list(archive.index())) == 3
+    assert archive.read_game(archive.last_entry())['log'] == games[2][0]
+
+    # The next append truncates it, so the new entry is aligned and readable
+    archive.append(make_log([5, 6]), AI_PLAYER, {'time_limit_ms': 1000})
+    assert os.path.getsize(archive.index_path) == 4 * INDEX_ENTRY.size
+    assert archive.read_game(archive.last_entry())['log'] == make_log([5, 6])
+    assert archive.stats()['1.0']['total'] == 3
+
+    # Archives already misaligned by an older writer: garbage entries are skipped, not fatal
+    with open(archive.index_path, 'ab') as f:
+        f.write(b'\xff' * 3 + INDEX_ENTRY.pack(0, 0.0, 0, 9, 0, 0, 0, 0))
+    assert len(list(archive.index())) == 4
+    assert len(list(archive.iter_games())) == 4
+    archive.stats()
+    archive.read_game(archive.last_entry())
+
+print('Game archive round trip and torn index tail OK')
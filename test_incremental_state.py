@@ -0,0 +1,37 @@
+# quick test: incremental frontier / win cells must match a from-scratch rebuild after make and unmake
+import random
+
+from gomoku.game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+
+
+def assert_matches_rebuild(game):
+    fresh = GomokuGame(board=game.board, current_player=game.current_player, size=game.size, win_len=game.win_len)
+    assert game.frontier == fresh.frontier, (set(game.frontier) ^ set(fresh.frontier))
+    for player in (AI_PLAYER, HUMAN_PLAYER):
+        assert game.win_cells[player] == fresh.win_cells[player], (player, game.win_cells[player] ^ fresh.win_cells[player])
+    assert game.empty_count == fresh.empty_count
+
+
+rng = random.Random(1234)
+games_checked = 0
+for size in (9, 15):
+    for _ in range(5):
+        game = GomokuGame(size=size)
+        played = []
+        player = HUMAN_PLAYER
+        for _ in range(rng.randrange(10, size * size)):
+            # Bias towards clustered play so plenty of fours and fives appear
+            candidates = list(game.frontier) or game.get_legal_moves()
+            move = rng.choice(candidates)
+            game.make_move(move, player)
+            played.append(move)
+            player = AI_PLAYER if player == HUMAN_PLAYER else HUMAN_PLAYER
+            assert_matches_rebuild(game)
+            assert_matches_rebuild(game.clone())
+        while played:
+            game.unmake_move(played.pop())
+            assert_matches_rebuild(game)
+        assert game.last_move == -1 and not game.frontier
+        games_checked += 1
+
+print('Incremental state matches rebuild for', games_checked, 'random games')
@@ -1,6 +1,6 @@
 # quick test: ensure AI prioritizes its immediate win over blocking opponent open three
-from gomoku_game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
-from mcts_ai import MCTS_AI
+from gomoku.game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from gomoku.mcts import MCTS_AI
 
 # 9x9 board default
 size = 9
@@ -0,0 +1,34 @@
+# quick test: early stopping ends a search on a clear position and leaves a close one to the full budget
+import time
+
+from gomoku.game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from gomoku.mcts import MCTS_AI
+
+
+def position(stones):
+    game = GomokuGame(size=6, win_len=4, current_player=AI_PLAYER)
+    for (row, col), player in stones:
+        game.make_move(row * 6 + col, player)
+    game.current_player = AI_PLAYER
+    return game
+
+
+def search(game, time_limit_ms, seed):
+    ai = MCTS_AI(seed=seed, weights_file=None)
+    start = time.monotonic()
+    move, _ = ai.find_best_move(game, time_limit_ms, 1)
+    return move, ai.last_search_stats['stop_reason'], time.monotonic() - start
+
+
+# X to move: (2, 3) turns the two into a three with both ends open; nothing else comes close
+clear = position([((2, 1), AI_PLAYER), ((2, 2), AI_PLAYER), ((4, 2), HUMAN_PLAYER), ((4, 3), HUMAN_PLAYER),
+                  ((0, 5), HUMAN_PLAYER)])
+move, reason, elapsed = search(clear, 4000, seed=2)
+print('clear position:', divmod(move, 6), reason, f"{elapsed:.2f}s of 4.00s")
+assert move == 2 * 6 + 3 and reason in ('decided', 'separated', 'stable') and elapsed < 4.0
+
+# Three stones in the middle of an open board: many moves are about equal
+close = position([((2, 2), HUMAN_PLAYER), ((3, 3), AI_PLAYER), ((2, 3), HUMAN_PLAYER)])
+move, reason, elapsed = search(close, 1500, seed=3)
+print('close position:', divmod(move, 6), reason, f"{elapsed:.2f}s of 1.50s")
+assert reason == 'budget' and elapsed >= 1.5
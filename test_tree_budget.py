@@ -0,0 +1,41 @@
+# quick test: a tree size budget is respected, and a frozen tree keeps searching below the root
+from gomoku.game import GomokuGame, AI_PLAYER, HUMAN_PLAYER
+from gomoku.mcts import MCTS_AI, count_nodes
+from gomoku.time_control import FixedIterations
+
+
+def position(size):
+    game = GomokuGame(size=size, current_player=AI_PLAYER)
+    centre = (size // 2) * size + size // 2
+    for move, player in ((centre, HUMAN_PLAYER), (centre + 1, AI_PLAYER), (centre - size, HUMAN_PLAYER)):
+        game.make_move(move, player)
+    return game
+
+
+def search(size, iterations, max_nodes, prune_policy):
+    ai = MCTS_AI(time_control=FixedIterations(iterations), seed=3, weights_file=None)
+    ai.max_nodes = max_nodes
+    ai.prune_policy = prune_policy
+    move, root_node = ai.find_best_move(position(size), 1, 1)
+    return ai, move, root_node
+
+
+# Budget below the root's branching factor: expansion freezes before every root move is
+# tried, and the remaining simulations must still spread over (and below) the root children
+game = position(15)
+ai, move, root_node = search(15, 600, 100, 'freeze')
+assert root_node.untried_moves and len(root_node.children) < game.empty_count
+assert count_nodes(root_node) <= 101, count_nodes(root_node)
+assert ai.last_search_stats['simulations'] == 600
+# Every simulation went through a root child rather than a rollout from the root itself
+assert sum(child.visits for child in root_node.children) == root_node.visits == 600
+print('frozen 15x15 search: root children', len(root_node.children),
+      'best visits', max(child.visits for child in root_node.children))
+
+# Pruning keeps a long search within its node budget
+ai, move, root_node = search(9, 3000, 300, 'prune')
+assert ai.last_search_stats['pruned_nodes'] > 0, ai.last_search_stats
+assert count_nodes(root_node) <= 301, count_nodes(root_node)
+assert ai.last_search_stats['tree_nodes'] == count_nodes(root_node)
+assert move in [child.move for child in root_node.children]
+print('pruned 9x9 search:', ai.last_search_stats)